@@ -1,6 +1,8 @@
 import argparse
+import gc
 import json
 import os
+import pickle
 import statistics
 import sys
 import time
@@ -10,59 +12,183 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
 try:
     import psutil  # type: ignore
 except ImportError:  # pragma: no cover
     psutil = None
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 from mock_os import state
 from planner.runner import run_planner
+from retrieval.embed import embed_backend, embed_texts
 from retrieval.index import build_index, query_index
 
 
 BENCH_RESULTS_PATH = ROOT / "bench" / "bench_results.json"
+INDEX_CACHE_PATH = ROOT / "bench" / ".index_cache.pkl"
+CORPUS_DIR = ROOT / "retrieval" / "corpus"
 
 
-def _percentile(values, percent):
-    if not values:
-        return 0.0
+def _percentiles(values, percents):
+    if len(values) == 0:
+        return [0.0 for _ in percents]
+    if np is not None:
+        return [float(v) for v in np.percentile(values, percents)]
     values = sorted(values)
-    k = (len(values) - 1) * percent / 100
-    f = int(k)
-    c = min(f + 1, len(values) - 1)
-    if f == c:
-        return values[int(k)]
-    return values[f] + (values[c] - values[f]) * (k - f)
+    results = []
+    for percent in percents:
+        k = (len(values) - 1) * percent / 100
+        f = int(k)
+        c = min(f + 1, len(values) - 1)
+        results.append(values[f] + (values[c] - values[f]) * (k - f))
+    return results
+
+
+def _index_cache_key() -> tuple:
+    files = sorted(CORPUS_DIR.glob("*.jsonl"))
+    stats = [(p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in files]
+    # Key on the embedder actually in effect and its output dim, not just the configured path,
+    # so an index built by another backend (or a swapped embedder) is never reused.
+    dim = len(embed_texts(["dim probe"])[0])
+    return (CORPUS_DIR.stat().st_mtime_ns, tuple(stats), embed_backend(), dim)
+
+
+def _load_index():
+    if os.getenv("BENCH_INDEX_CACHE", "0") != "1":
+        return build_index()
+    cache_key = _index_cache_key()
+    try:
+        with open(INDEX_CACHE_PATH, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("key") == cache_key:
+            return cached["index"], cached["docs"]
+    except Exception:
+        pass
+    index, docs = build_index()
+    try:
+        with open(INDEX_CACHE_PATH, "wb") as f:
+            pickle.dump({"key": cache_key, "index": index, "docs": docs}, f)
+    except Exception:
+        # Native indexes (e.g. faiss) may not be picklable; fall back to rebuilding.
+        INDEX_CACHE_PATH.unlink(missing_ok=True)
+    return index, docs
+
+
+def _peak_rss_bytes() -> int:
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+        return int(max_rss if sys.platform == "darwin" else max_rss * 1024)
+    if psutil is not None:
+        info = psutil.Process(os.getpid()).memory_info()
+        return int(getattr(info, "peak_wset", info.rss))
+    return 0
+
+
+def _timer_overhead_ns(samples: int = 1024) -> int:
+    deltas = []
+    prev = time.perf_counter_ns()
+    for _ in range(samples):
+        now = time.perf_counter_ns()
+        deltas.append(now - prev)
+        prev = now
+    return int(statistics.median(deltas))
+
+
+def _calibrate_batch(fn, target_ns: int = 50_000, max_batch: int = 1 << 16) -> int:
+    batch = 1
+    while batch < max_batch:
+        t0 = time.perf_counter_ns()
+        for _ in range(batch):
+            fn()
+        if time.perf_counter_ns() - t0 >= target_ns:
+            break
+        batch *= 2
+    return batch
+
+
+def _stable_warmup(fn, max_samples: int, tolerance: float = 1.1) -> bool:
+    samples: list[int] = []
+    for _ in range(max_samples):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append(max(time.perf_counter_ns() - t0, 1))
+        last3 = samples[-3:]
+        if len(last3) == 3 and max(last3) / min(last3) < tolerance:
+            return True
+    return False
 
 
 def benchmark(model_path: str | None, warmups: int, runs: int) -> dict:
+    # Repeated identical calls would otherwise be served from run_planner's result cache. The
+    # override is undone afterwards so an in-process caller (e.g. a pytest session) keeps its cache.
+    previous = os.environ.get("PLANNER_CACHE_DISABLE")
+    if previous is None:
+        os.environ["PLANNER_CACHE_DISABLE"] = "1"
+    try:
+        return _run_benchmark(model_path, warmups, runs)
+    finally:
+        if previous is None:
+            os.environ.pop("PLANNER_CACHE_DISABLE", None)
+
+
+def _run_benchmark(model_path: str | None, warmups: int, runs: int) -> dict:
     if model_path:
         os.environ["GPT_OSS_MODEL_PATH"] = model_path
-    index, docs = build_index()
+    index, docs = _load_index()
     snippets = [s for _, s in query_index(index, docs, "benchmark", top_k=1)]
-    process = psutil.Process(os.getpid()) if psutil is not None else None
-    peak_rss = process.memory_info().rss if process else 0
+    # run_planner only reads the snapshot, so one copy serves every iteration.
+    snapshot = state.snapshot()
 
     for _ in range(max(warmups, 0)):
-        run_planner(snippets, state.snapshot(), "warmup",)
-
-    latencies: list[float] = []
-    for _ in range(max(runs, 0)):
-        start = time.perf_counter()
-        run_planner(snippets, state.snapshot(), "benchmark model",)
-        elapsed = time.perf_counter() - start
-        latencies.append(elapsed)
-        if process:
-            peak_rss = max(peak_rss, process.memory_info().rss)
-
-    p50 = _percentile(latencies, 50) * 1000
-    p95 = _percentile(latencies, 95) * 1000
+        run_planner(snippets, snapshot, "warmup",)
+
+    def measured_call():
+        run_planner(snippets, snapshot, "benchmark model",)
+
+    # Keep discarding samples until three in a row agree, so one-shot lazy
+    # loads and cold caches do not leak into the measured distribution.
+    warmup_stable = _stable_warmup(measured_call, max(2 * warmups, 3))
+
+    timer_overhead_ns = _timer_overhead_ns()
+    batch_size = _calibrate_batch(measured_call)
+    runs = max(runs, 0)
+    latencies_ns = np.empty(runs, dtype=np.float64) if np is not None else [0.0] * runs
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(runs):
+            t0 = time.perf_counter_ns()
+            for _ in range(batch_size):
+                measured_call()
+            elapsed_ns = time.perf_counter_ns() - t0 - timer_overhead_ns
+            latencies_ns[i] = max(elapsed_ns, 0) / batch_size
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    peak_rss = _peak_rss_bytes()
+
+    p50, p95 = (p / 1e6 for p in _percentiles(latencies_ns, [50, 95]))
 
     results = {
         "runs": runs,
         "warmups": warmups,
+        "warmup_stable": warmup_stable,
         "model_path": model_path,
         "latencies_ms": {"p50": p50, "p95": p95},
+        "timer_overhead_ns": timer_overhead_ns,
+        "batch_size": batch_size,
         "peak_rss": peak_rss,
     }
 
@@ -1,44 +1,91 @@
-import copy
-from typing import Dict, Any, List
+import functools
+from typing import Callable, Dict, Any, List
 
 from planner.schema import Plan, Step
 from mock_os import state
 from telemetry.logger import log_event
 
 
-def _apply_step(target_state: Dict[str, Any], step: Step) -> None:
-    api = step.api_call
-    args = step.args or {}
+def _append_log(target_state: Dict[str, Any], args: Dict[str, Any]) -> None:
+    target_state["logs"].append(args.get("message", ""))
+
+
+def _open_window(target_state: Dict[str, Any], args: Dict[str, Any]) -> None:
+    window = args.get("window") or {
+        "id": f"win-{len(target_state['windows'])+1}",
+        "title": args.get("title", "Window"),
+        "active": True,
+    }
+    target_state["windows"].append(window)
+
+
+def _write_clipboard(target_state: Dict[str, Any], args: Dict[str, Any]) -> None:
+    target_state["clipboard"] = args.get("text", "")
+
+
+def _update_setting(target_state: Dict[str, Any], args: Dict[str, Any]) -> None:
+    key = args.get("key", "unknown")
+    target_state["settings"][key] = args.get("value")
+
+
+def _noop(target_state: Dict[str, Any], args: Dict[str, Any]) -> None:
+    return None
+
+
+_DISPATCH = {
+    "append_log": _append_log,
+    "open_window": _open_window,
+    "write_clipboard": _write_clipboard,
+    "update_setting": _update_setting,
+}
+
+
+def _ensure_state_keys(target_state: Dict[str, Any]) -> None:
     target_state.setdefault("windows", [])
     target_state.setdefault("settings", {})
     target_state.setdefault("logs", [])
     target_state.setdefault("clipboard", "")
 
-    if api == "append_log":
-        target_state["logs"].append(args.get("message", ""))
-    elif api == "open_window":
-        window = args.get("window") or {
-            "id": f"win-{len(target_state['windows'])+1}",
-            "title": args.get("title", "Window"),
-            "active": True,
-        }
-        target_state["windows"].append(window)
-    elif api == "write_clipboard":
-        target_state["clipboard"] = args.get("text", "")
-    elif api == "update_setting":
-        key = args.get("key", "unknown")
-        target_state["settings"][key] = args.get("value")
+
+def _apply_step(target_state: Dict[str, Any], step: Step) -> None:
+    # Callers run _ensure_state_keys once before applying a sequence of steps.
+    _DISPATCH.get(step.api_call, _noop)(target_state, step.args or {})
+
+
+def _clone_value(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return state.clone(value)
 
 
 def _diff_states(original: Dict[str, Any], updated: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
     diff: Dict[str, Dict[str, Any]] = {}
     keys = set(original.keys()) | set(updated.keys())
     for key in keys:
-        if original.get(key) != updated.get(key):
-            diff[key] = {"from": copy.deepcopy(original.get(key)), "to": copy.deepcopy(updated.get(key))}
+        before = original.get(key)
+        after = updated.get(key)
+        if before is after or before == after:
+            continue
+        diff[key] = {"from": _clone_value(before), "to": _clone_value(after)}
     return diff
 
 
+def _log_result(event_name: str) -> Callable:
+    def decorator(fn: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+            result = fn(*args, **kwargs)
+            try:
+                log_event({"event": event_name, f"{event_name}_result": result})
+            except Exception:
+                pass
+            return result
+
+        return wrapper
+
+    return decorator
+
+
 def _state_mismatch_response(expected_state: Dict[str, Any]) -> Dict[str, Any]:
     current_state = state.snapshot()
     state.restore_last()
@@ -53,6 +100,8 @@ def _state_mismatch_response(expected_state: Dict[str, Any]) -> Dict[str, Any]:
 def dry_run(plan: Plan) -> Dict[str, Any]:
     original = state.snapshot()
     simulated = state.snapshot()
+    if plan.steps:
+        _ensure_state_keys(simulated)
     for step in plan.steps:
         _apply_step(simulated, step)
     preview = {
@@ -68,50 +117,34 @@ def dry_run(plan: Plan) -> Dict[str, Any]:
     return preview
 
 
+@_log_result("run")
 def run(plan: Plan) -> Dict[str, Any]:
     before = state.snapshot()
     state.save_checkpoint()
     previous_expected: Dict[str, Any] | None = None
     applied_steps: List[str] = []
+    if plan.steps:
+        _ensure_state_keys(state.STATE)
     for step in plan.steps:
         if previous_expected is not None and not state.validate(previous_expected):
-            response = _state_mismatch_response(previous_expected)
-            try:
-                log_event({"event": "run", "run_result": response})
-            except Exception:
-                pass
-            return response
+            return _state_mismatch_response(previous_expected)
         _apply_step(state.STATE, step)
         applied_steps.append(step.step_label)
         previous_expected = step.expected_state or {}
 
     if previous_expected is not None and not state.validate(previous_expected):
-        response = _state_mismatch_response(previous_expected)
-        try:
-            log_event({"event": "run", "run_result": response})
-        except Exception:
-            pass
-        return response
+        return _state_mismatch_response(previous_expected)
 
     current = state.snapshot()
-    result = {
+    return {
         "applied": True,
         "state": current,
         "applied_steps": applied_steps,
         "diff": _diff_states(before, current),
     }
-    try:
-        log_event({"event": "run", "run_result": result})
-    except Exception:
-        pass
-    return result
 
 
+@_log_result("undo")
 def undo() -> Dict[str, Any]:
     restored = state.restore_last()
-    result = {"state": restored}
-    try:
-        log_event({"event": "undo", "undo_result": result})
-    except Exception:
-        pass
-    return result
+    return {"state": restored}
@@ -1,5 +1,12 @@
 import copy
-from typing import Dict, Any, List
+import os
+from collections import deque
+from typing import Deque, Dict, Any
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
 
 STATE: Dict[str, Any] = {
     "windows": [{"id": "desktop", "title": "Desktop", "active": True}],
@@ -8,11 +15,27 @@ STATE: Dict[str, Any] = {
     "clipboard": "",
 }
 
-HISTORY: List[Dict[str, Any]] = []
+# Bounded so long-lived API workers do not keep every checkpoint forever.
+HISTORY: Deque[Dict[str, Any]] = deque(maxlen=max(int(os.getenv("MOCK_OS_HISTORY", "64")), 1))
+
+
+def clone(obj: Any) -> Any:
+    """Deep-copy state, via an orjson round-trip when it is exact and deepcopy otherwise."""
+    if orjson is not None:
+        try:
+            copied = orjson.loads(orjson.dumps(obj))
+        except TypeError:
+            pass
+        else:
+            # The round-trip is silently lossy for NaN (-> None) and tuples (-> lists); equality
+            # catches both, and is still far cheaper than deepcopy for plain JSON data.
+            if copied == obj:
+                return copied
+    return copy.deepcopy(obj)
 
 
 def snapshot() -> Dict[str, Any]:
-    return copy.deepcopy(STATE)
+    return clone(STATE)
 
 
 def save_checkpoint() -> None:
@@ -28,8 +51,9 @@ def restore_last() -> Dict[str, Any]:
 
 
 def set_state(new_state: Dict[str, Any]) -> None:
+    # Takes ownership of new_state; callers pass a fresh copy (e.g. a popped checkpoint).
     STATE.clear()
-    STATE.update(copy.deepcopy(new_state))
+    STATE.update(new_state)
 
 
 def append_log(message: str) -> None:
@@ -41,7 +65,8 @@ def set_clipboard(text: str) -> None:
 
 
 def add_window(window: Dict[str, Any]) -> None:
-    STATE.setdefault("windows", []).append(copy.deepcopy(window))
+    # Takes ownership of window; callers build a fresh dict per call.
+    STATE.setdefault("windows", []).append(window)
 
 
 def update_setting(key: str, value: Any) -> None:
@@ -51,8 +76,7 @@ def update_setting(key: str, value: Any) -> None:
 def validate(expected_state: Dict[str, Any]) -> bool:
     if not expected_state:
         return True
-    current = snapshot()
     for key, value in expected_state.items():
-        if current.get(key) != value:
+        if STATE.get(key) != value:
             return False
     return True
@@ -0,0 +1,102 @@
+# Generated by scripts/regen_plan_validator.py from contracts/planner_output.schema.json. Do not edit.
+SCHEMA_SHA256 = "7934a3eb00ae395e0d2b20e6f1214d4d2cdb8bb285bcae4c7a7c318dd397bbbb"
+VERSION = "2.22.2"
+from decimal import Decimal
+from fastjsonschema import JsonSchemaValueException, JsonSchemaValuesException
+
+
+NoneType = type(None)
+
+def validate(data, custom_formats={}, name_prefix=None):
+    if not isinstance(data, (dict)):
+        raise JsonSchemaValueException("" + (name_prefix or "data") + " must be object", value=data, name="" + (name_prefix or "data") + "", definition={'$schema': 'http://json-schema.org/draft-07/schema#', 'title': 'PlannerOutput', 'type': 'object', 'additionalProperties': False, 'required': ['intent', 'slots', 'steps', 'sources', 'confidence'], 'properties': {'intent': {'type': 'string'}, 'slots': {'type': 'object', 'additionalProperties': True}, 'steps': {'type': 'array', 'minItems': 1, 'items': {'type': 'object', 'additionalProperties': False, 'required': ['step_label', 'api_call', 'args', 'expected_state'], 'properties': {'step_label': {'type': 'string'}, 'api_call': {'type': 'string'}, 'args': {'type': 'object', 'additionalProperties': True}, 'expected_state': {'type': 'object', 'additionalProperties': True}}}}, 'sources': {'type': 'array', 'items': {'type': 'string'}}, 'confidence': {'type': 'number', 'minimum': 0, 'maximum': 1}}}, rule='type')
+    data_is_dict = isinstance(data, dict)
+    if data_is_dict:
+        data__missing_keys = set(['intent', 'slots', 'steps', 'sources', 'confidence']) - data.keys()
+        if data__missing_keys:
+            raise JsonSchemaValueException("" + (name_prefix or "data") + " must contain " + (str(sorted(data__missing_keys)) + " properties"), value=data, name="" + (name_prefix or "data") + "", definition={'$schema': 'http://json-schema.org/draft-07/schema#', 'title': 'PlannerOutput', 'type': 'object', 'additionalProperties': False, 'required': ['intent', 'slots', 'steps', 'sources', 'confidence'], 'properties': {'intent': {'type': 'string'}, 'slots': {'type': 'object', 'additionalProperties': True}, 'steps': {'type': 'array', 'minItems': 1, 'items': {'type': 'object', 'additionalProperties': False, 'required': ['step_label', 'api_call', 'args', 'expected_state'], 'properties': {'step_label': {'type': 'string'}, 'api_call': {'type': 'string'}, 'args': {'type': 'object', 'additionalProperties': True}, 'expected_state': {'type': 'object', 'additionalProperties': True}}}}, 'sources': {'type': 'array', 'items': {'type': 'string'}}, 'confidence': {'type': 'number', 'minimum': 0, 'maximum': 1}}}, rule='required')
+        data_keys = set(data.keys())
+        if "intent" in data_keys:
+            data_keys.remove("intent")
+            data__intent = data["intent"]
+            if not isinstance(data__intent, (str)):
+                raise JsonSchemaValueException("" + (name_prefix or "data") + ".intent must be string", value=data__intent, name="" + (name_prefix or "data") + ".intent", definition={'type': 'string'}, rule='type')
+        if "slots" in data_keys:
+            data_keys.remove("slots")
+            data__slots = data["slots"]
+            if not isinstance(data__slots, (dict)):
+                raise JsonSchemaValueException("" + (name_prefix or "data") + ".slots must be object", value=data__slots, name="" + (name_prefix or "data") + ".slots", definition={'type': 'object', 'additionalProperties': True}, rule='type')
+            data__slots_is_dict = isinstance(data__slots, dict)
+            if data__slots_is_dict:
+                data__slots_keys = set(data__slots.keys())
+        if "steps" in data_keys:
+            data_keys.remove("steps")
+            data__steps = data["steps"]
+            if not isinstance(data__steps, (list, tuple)):
+                raise JsonSchemaValueException("" + (name_prefix or "data") + ".steps must be array", value=data__steps, name="" + (name_prefix or "data") + ".steps", definition={'type': 'array', 'minItems': 1, 'items': {'type': 'object', 'additionalProperties': False, 'required': ['step_label', 'api_call', 'args', 'expected_state'], 'properties': {'step_label': {'type': 'string'}, 'api_call': {'type': 'string'}, 'args': {'type': 'object', 'additionalProperties': True}, 'expected_state': {'type': 'object', 'additionalProperties': True}}}}, rule='type')
+            data__steps_is_list = isinstance(data__steps, (list, tuple))
+            if data__steps_is_list:
+                data__steps_len = len(data__steps)
+                if data__steps_len < 1:
+                    raise JsonSchemaValueException("" + (name_prefix or "data") + ".steps must contain at least 1 items", value=data__steps, name="" + (name_prefix or "data") + ".steps", definition={'type': 'array', 'minItems': 1, 'items': {'type': 'object', 'additionalProperties': False, 'required': ['step_label', 'api_call', 'args', 'expected_state'], 'properties': {'step_label': {'type': 'string'}, 'api_call': {'type': 'string'}, 'args': {'type': 'object', 'additionalProperties': True}, 'expected_state': {'type': 'object', 'additionalProperties': True}}}}, rule='minItems')
+                for data__steps_x, data__steps_item in enumerate(data__steps):
+                    if not isinstance(data__steps_item, (dict)):
+                        raise JsonSchemaValueException("" + (name_prefix or "data") + ".steps[{data__steps_x}]".format(**locals()) + " must be object", value=data__steps_item, name="" + (name_prefix or "data") + ".steps[{data__steps_x}]".format(**locals()) + "", definition={'type': 'object', 'additionalProperties': False, 'required': ['step_label', 'api_call', 'args', 'expected_state'], 'properties': {'step_label': {'type': 'string'}, 'api_call': {'type': 'string'}, 'args': {'type': 'object', 'additionalProperties': True}, 'expected_state': {'type': 'object', 'additionalProperties': True}}}, rule='type')
+                    data__steps_item_is_dict = isinstance(data__steps_item, dict)
+                    if data__steps_item_is_dict:
+                        data__steps_item__missing_keys = set(['step_label', 'api_call', 'args', 'expected_state']) - data__steps_item.keys()
+                        if data__steps_item__missing_keys:
+                            raise JsonSchemaValueException("" + (name_prefix or "data") + ".steps[{data__steps_x}]".format(**locals()) + " must contain " + (str(sorted(data__steps_item__missing_keys)) + " properties"), value=data__steps_item, name="" + (name_prefix or "data") + ".steps[{data__steps_x}]".format(**locals()) + "", definition={'type': 'object', 'additionalProperties': False, 'required': ['step_label', 'api_call', 'args', 'expected_state'], 'properties': {'step_label': {'type': 'string'}, 'api_call': {'type': 'string'}, 'args': {'type': 'object', 'additionalProperties': True}, 'expected_state': {'type': 'object', 'additionalProperties': True}}}, rule='required')
+                        data__steps_item_keys = set(data__steps_item.keys())
+                        if "step_label" in data__steps_item_keys:
+                            data__steps_item_keys.remove("step_label")
+                            data__steps_item__steplabel = data__steps_item["step_label"]
+                            if not isinstance(data__steps_item__steplabel, (str)):
+                                raise JsonSchemaValueException("" + (name_prefix or "data") + ".steps[{data__steps_x}].step_label".format(**locals()) + " must be string", value=data__steps_item__steplabel, name="" + (name_prefix or "data") + ".steps[{data__steps_x}].step_label".format(**locals()) + "", definition={'type': 'string'}, rule='type')
+                        if "api_call" in data__steps_item_keys:
+                            data__steps_item_keys.remove("api_call")
+                            data__steps_item__apicall = data__steps_item["api_call"]
+                            if not isinstance(data__steps_item__apicall, (str)):
+                                raise JsonSchemaValueException("" + (name_prefix or "data") + ".steps[{data__steps_x}].api_call".format(**locals()) + " must be string", value=data__steps_item__apicall, name="" + (name_prefix or "data") + ".steps[{data__steps_x}].api_call".format(**locals()) + "", definition={'type': 'string'}, rule='type')
+                        if "args" in data__steps_item_keys:
+                            data__steps_item_keys.remove("args")
+                            data__steps_item__args = data__steps_item["args"]
+                            if not isinstance(data__steps_item__args, (dict)):
+                                raise JsonSchemaValueException("" + (name_prefix or "data") + ".steps[{data__steps_x}].args".format(**locals()) + " must be object", value=data__steps_item__args, name="" + (name_prefix or "data") + ".steps[{data__steps_x}].args".format(**locals()) + "", definition={'type': 'object', 'additionalProperties': True}, rule='type')
+                            data__steps_item__args_is_dict = isinstance(data__steps_item__args, dict)
+                            if data__steps_item__args_is_dict:
+                                data__steps_item__args_keys = set(data__steps_item__args.keys())
+                        if "expected_state" in data__steps_item_keys:
+                            data__steps_item_keys.remove("expected_state")
+                            data__steps_item__expectedstate = data__steps_item["expected_state"]
+                            if not isinstance(data__steps_item__expectedstate, (dict)):
+                                raise JsonSchemaValueException("" + (name_prefix or "data") + ".steps[{data__steps_x}].expected_state".format(**locals()) + " must be object", value=data__steps_item__expectedstate, name="" + (name_prefix or "data") + ".steps[{data__steps_x}].expected_state".format(**locals()) + "", definition={'type': 'object', 'additionalProperties': True}, rule='type')
+                            data__steps_item__expectedstate_is_dict = isinstance(data__steps_item__expectedstate, dict)
+                            if data__steps_item__expectedstate_is_dict:
+                                data__steps_item__expectedstate_keys = set(data__steps_item__expectedstate.keys())
+                        if data__steps_item_keys:
+                            raise JsonSchemaValueException("" + (name_prefix or "data") + ".steps[{data__steps_x}]".format(**locals()) + " must not contain "+str(data__steps_item_keys)+" properties", value=data__steps_item, name="" + (name_prefix or "data") + ".steps[{data__steps_x}]".format(**locals()) + "", definition={'type': 'object', 'additionalProperties': False, 'required': ['step_label', 'api_call', 'args', 'expected_state'], 'properties': {'step_label': {'type': 'string'}, 'api_call': {'type': 'string'}, 'args': {'type': 'object', 'additionalProperties': True}, 'expected_state': {'type': 'object', 'additionalProperties': True}}}, rule='additionalProperties')
+        if "sources" in data_keys:
+            data_keys.remove("sources")
+            data__sources = data["sources"]
+            if not isinstance(data__sources, (list, tuple)):
+                raise JsonSchemaValueException("" + (name_prefix or "data") + ".sources must be array", value=data__sources, name="" + (name_prefix or "data") + ".sources", definition={'type': 'array', 'items': {'type': 'string'}}, rule='type')
+            data__sources_is_list = isinstance(data__sources, (list, tuple))
+            if data__sources_is_list:
+                data__sources_len = len(data__sources)
+                for data__sources_x, data__sources_item in enumerate(data__sources):
+                    if not isinstance(data__sources_item, (str)):
+                        raise JsonSchemaValueException("" + (name_prefix or "data") + ".sources[{data__sources_x}]".format(**locals()) + " must be string", value=data__sources_item, name="" + (name_prefix or "data") + ".sources[{data__sources_x}]".format(**locals()) + "", definition={'type': 'string'}, rule='type')
+        if "confidence" in data_keys:
+            data_keys.remove("confidence")
+            data__confidence = data["confidence"]
+            if not isinstance(data__confidence, (int, float, Decimal)) or isinstance(data__confidence, bool):
+                raise JsonSchemaValueException("" + (name_prefix or "data") + ".confidence must be number", value=data__confidence, name="" + (name_prefix or "data") + ".confidence", definition={'type': 'number', 'minimum': 0, 'maximum': 1}, rule='type')
+            if isinstance(data__confidence, (int, float, Decimal)):
+                if data__confidence < 0:
+                    raise JsonSchemaValueException("" + (name_prefix or "data") + ".confidence must be bigger than or equal to 0", value=data__confidence, name="" + (name_prefix or "data") + ".confidence", definition={'type': 'number', 'minimum': 0, 'maximum': 1}, rule='minimum')
+                if data__confidence > 1:
+                    raise JsonSchemaValueException("" + (name_prefix or "data") + ".confidence must be smaller than or equal to 1", value=data__confidence, name="" + (name_prefix or "data") + ".confidence", definition={'type': 'number', 'minimum': 0, 'maximum': 1}, rule='maximum')
+        if data_keys:
+            raise JsonSchemaValueException("" + (name_prefix or "data") + " must not contain "+str(data_keys)+" properties", value=data, name="" + (name_prefix or "data") + "", definition={'$schema': 'http://json-schema.org/draft-07/schema#', 'title': 'PlannerOutput', 'type': 'object', 'additionalProperties': False, 'required': ['intent', 'slots', 'steps', 'sources', 'confidence'], 'properties': {'intent': {'type': 'string'}, 'slots': {'type': 'object', 'additionalProperties': True}, 'steps': {'type': 'array', 'minItems': 1, 'items': {'type': 'object', 'additionalProperties': False, 'required': ['step_label', 'api_call', 'args', 'expected_state'], 'properties': {'step_label': {'type': 'string'}, 'api_call': {'type': 'string'}, 'args': {'type': 'object', 'additionalProperties': True}, 'expected_state': {'type': 'object', 'additionalProperties': True}}}}, 'sources': {'type': 'array', 'items': {'type': 'string'}}, 'confidence': {'type': 'number', 'minimum': 0, 'maximum': 1}}}, rule='additionalProperties')
+    return data
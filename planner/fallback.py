@@ -1,4 +1,3 @@
-import copy
 import json
 from typing import Any, Dict, List
 
@@ -13,19 +12,16 @@ def _steps_from_snippet(snippet: str) -> List[Dict[str, Any]]:
     snippet_steps = parsed.get("steps")
     if not isinstance(snippet_steps, list):
         return []
-    normalized: List[Dict[str, Any]] = []
-    for idx, step in enumerate(snippet_steps):
-        if not isinstance(step, dict):
-            continue
-        normalized.append(
-            {
-                "step_label": step.get("step_label", f"fallback_step_{idx+1}"),
-                "api_call": step.get("api_call", "append_log"),
-                "args": step.get("args", {}),
-                "expected_state": step.get("expected_state", {}),
-            }
-        )
-    return normalized
+    return [
+        {
+            "step_label": step.get("step_label", f"fallback_step_{idx+1}"),
+            "api_call": step.get("api_call", "append_log"),
+            "args": step.get("args", {}),
+            "expected_state": step.get("expected_state", {}),
+        }
+        for idx, step in enumerate(snippet_steps)
+        if isinstance(step, dict)
+    ]
 
 
 def fallback_plan(retrieval_snippets: List[str], state_snapshot: Dict[str, Any], user_query: str) -> Dict[str, Any]:
@@ -36,7 +32,10 @@ def fallback_plan(retrieval_snippets: List[str], state_snapshot: Dict[str, Any],
         steps.extend(snippet_steps)
 
     if not steps:
-        logs = copy.deepcopy(state_snapshot.get("logs", []))
+        # Only concatenated into a new list below, so no copy of the snapshot is needed.
+        logs = state_snapshot.get("logs", [])
+        if not isinstance(logs, list):
+            logs = []
         steps.append(
             {
                 "step_label": "log_fallback_intent",
@@ -1,6 +1,11 @@
 import json
 from typing import List, Dict, Any
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 SYSTEM_PROMPT = r"""
 You are the Assistant Planner. OUTPUT ONLY valid JSON conforming exactly to the PlannerOutput schema at /contracts/planner_output.schema.json. No prose, no comments, no backticks. If you cannot generate a grounded plan, output exactly:
@@ -26,19 +31,34 @@ END SYSTEM PROMPT
 """
 
 
+def _dumps(obj: Any) -> str:
+    # Both paths emit the same compact UTF-8 JSON so the prompt does not depend on orjson being installed.
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            # orjson rejects non-str dict keys (e.g. settings[5] from update_setting); json coerces them.
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+PLAN_SCHEMA_HINT = "intent:string, slots:object, steps:[{step_label, api_call, args, expected_state}], sources:list, confidence:number"
+PROMPT_INSTRUCTIONS = [
+    "Use only available mock_os APIs: open_window, write_clipboard, update_setting, append_log.",
+    "Keep steps minimal and ordered.",
+    "All fields required.",
+]
+
+# The system/schema/instructions scaffold never changes, so it is encoded once;
+# build_prompt only serializes the per-call context between these two halves.
+_PROMPT_HEAD = _dumps({"system": SYSTEM_PROMPT, "schema": PLAN_SCHEMA_HINT})[:-1] + ',"context":'
+_PROMPT_TAIL = ',"instructions":' + _dumps(PROMPT_INSTRUCTIONS) + "}"
+
+
 def build_prompt(retrieval_snippets: List[str], state_snapshot: Dict[str, Any], user_query: str) -> str:
-    prompt = {
-        "system": SYSTEM_PROMPT,
-        "schema": "intent:string, slots:object, steps:[{step_label, api_call, args, expected_state}], sources:list, confidence:number",
-        "context": {
-            "retrieval_snippets": retrieval_snippets,
-            "state": state_snapshot,
-            "user_query": user_query,
-        },
-        "instructions": [
-            "Use only available mock_os APIs: open_window, write_clipboard, update_setting, append_log.",
-            "Keep steps minimal and ordered.",
-            "All fields required.",
-        ],
+    context = {
+        "retrieval_snippets": retrieval_snippets,
+        "state": state_snapshot,
+        "user_query": user_query,
     }
-    return json.dumps(prompt, ensure_ascii=True)
+    return _PROMPT_HEAD + _dumps(context) + _PROMPT_TAIL
@@ -1,60 +1,417 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import hashlib
+import importlib
 import json
 import logging
 import os
+import queue
+import random
+import threading
+import time
+import weakref
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Sequence, Tuple
 
-import requests
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
 
 try:
-    import jsonschema
+    import fastjsonschema  # type: ignore
 except ImportError:  # pragma: no cover
-    jsonschema = None  # type: ignore
+    fastjsonschema = None  # type: ignore
+
+if TYPE_CHECKING:  # pragma: no cover
+    import requests
 
 logger = logging.getLogger(__name__)
-_LOG_PATH = Path(__file__).resolve().parents[1] / "reports" / "remote_adapter.log"
+_MODULE_DIR = Path(__file__).resolve().parent
+_SCHEMA_PATH = _MODULE_DIR.parent / "contracts" / "planner_output.schema.json"
+_LOG_PATH = _MODULE_DIR.parent / "reports" / "remote_adapter.log"
+_LOGGER_READY = False
+_LOGGER_LOCK = threading.Lock()
 _SCHEMA_CACHE: Dict[str, Any] | None = None
+_PARAMETERS_SCHEMA_CACHE: Dict[str, Any] | None = None
+_HTTP: requests.Session | None = None
+_LAZY_MODULES: Dict[str, Any] = {}
+_ASYNC_HTTP: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any] = weakref.WeakKeyDictionary()
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 529})
+_RETRY_MAX_DELAY_SECONDS = 30.0
+_RETRY_MIN_ATTEMPT_SECONDS = 1.0
+_VALIDATOR_CACHE: Callable[[Dict[str, Any]], Any] | None = None
+_REQUIRED: Tuple[str, ...] = ()
+_PROPERTIES: Dict[str, Any] = {}
+_ADDITIONAL: Any = False
+_STEP_KEYS = ("step_label", "api_call", "args", "expected_state")
+_OPENAI_TOOLS_CACHE: List[Dict[str, Any]] | None = None
+_GOOGLE_TOOLS_CACHE: List[Dict[str, Any]] | None = None
+
+_SYSTEM_TEXT = (
+    "You are a deterministic planning engine. "
+    "Return only a single JSON object that matches the PlannerOutput schema in contracts/planner_output.schema.json. "
+    "Do not include any text outside the JSON object and do not invent additional fields."
+)
+_OPENAI_SYSTEM_MSG = {"role": "system", "content": _SYSTEM_TEXT}
+_OPENAI_TOOL_CHOICE = {"type": "function", "function": {"name": "emit_plan"}}
+_GOOGLE_SYSTEM_INSTRUCTION = {"parts": [{"text": _SYSTEM_TEXT}]}
+_GOOGLE_TOOL_CONFIG = {"functionCallConfig": {"mode": "ANY", "allowedFunctionNames": ["emit_plan"]}}
+
+
+def _dumps(obj: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _optional_module(name: str) -> Any:
+    # requests, httpx and jsonschema pull in large import graphs; load them on first use
+    # so importing planner.runner stays cheap when the remote path is never taken.
+    if name not in _LAZY_MODULES:
+        try:
+            _LAZY_MODULES[name] = importlib.import_module(name)
+        except ImportError:  # pragma: no cover
+            _LAZY_MODULES[name] = None
+    return _LAZY_MODULES[name]
+
+
+def _requests() -> Any:
+    module = _optional_module("requests")
+    if module is None:  # pragma: no cover
+        raise RuntimeError("requests is required for call_remote_planner")
+    return module
+
+
+def _httpx() -> Any:
+    module = _optional_module("httpx")
+    if module is None:
+        raise RuntimeError("httpx is required for acall_remote_planner")
+    return module
 
 
 def _ensure_logger() -> None:
-    if logger.handlers:
+    # Runs on the first planner call, not at import: planner.runner imports this module even when
+    # the remote path is off, and that must not start a thread or create reports/.
+    global _LOGGER_READY
+    if _LOGGER_READY:
         return
-    _LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    handler = logging.FileHandler(_LOG_PATH, encoding="utf-8")
-    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
-    logger.addHandler(handler)
-    logger.setLevel(logging.INFO)
-    logger.propagate = False
+    with _LOGGER_LOCK:
+        if _LOGGER_READY:
+            return
+        _LOGGER_READY = True
+        if logger.handlers:
+            return
+        try:
+            _LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            # Read-only install or cwd: keep propagating to the root logger rather than failing the call.
+            return
+        # Records are queued on the request path and written to disk by a listener thread.
+        file_handler = logging.FileHandler(_LOG_PATH, encoding="utf-8", delay=True)
+        file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        log_queue: queue.Queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        logger.addHandler(QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+def _http_session() -> requests.Session:
+    # One pooled session per process so repeated planner calls reuse TCP/TLS connections.
+    global _HTTP
+    if _HTTP is None:
+        requests = _requests()
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _HTTP = session
+    return _HTTP
+
+
+def _retry_delay(attempt: int, response: requests.Response | None) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(_RETRY_MAX_DELAY_SECONDS, max(float(retry_after), 0.0))
+        except ValueError:
+            pass
+    return min(_RETRY_MAX_DELAY_SECONDS, 1.0 * 2**attempt) * (1 + random.uniform(0, 0.5))
+
+
+def _retry_attempts() -> int:
+    return max(int(os.getenv("REMOTE_RETRY_ATTEMPTS", "4") or 4), 1)
+
+
+def _retry_fits(deadline: float, delay: float) -> bool:
+    # Only sleep and retry when a useful attempt window still fits before the caller's deadline.
+    return deadline - time.monotonic() - delay >= _RETRY_MIN_ATTEMPT_SECONDS
+
+
+def _attempt_timeout(deadline: float) -> float:
+    return max(deadline - time.monotonic(), _RETRY_MIN_ATTEMPT_SECONDS)
+
+
+def _post_with_retry(url: str, timeout: int, **kwargs: Any) -> requests.Response:
+    """POST with exponential backoff and jitter on timeouts, resets and 429/5xx responses.
+
+    All attempts and sleeps share one ``timeout`` budget: each attempt gets the time remaining,
+    and retrying stops once the next backoff would leave less than a minimal attempt window.
+    """
+    requests = _requests()
+    deadline = time.monotonic() + timeout
+    attempts = _retry_attempts()
+    attempt = 0
+    while True:
+        last = attempt >= attempts - 1
+        try:
+            response = _http_session().post(url, timeout=_attempt_timeout(deadline), **kwargs)
+        except (requests.Timeout, requests.ConnectionError) as exc:
+            delay = _retry_delay(attempt, None)
+            if last or not _retry_fits(deadline, delay):
+                raise
+            logger.warning("remote adapter request failed (%s); retrying in %.2fs", exc.__class__.__name__, delay)
+        else:
+            if response.status_code not in _RETRY_STATUSES:
+                return response
+            delay = _retry_delay(attempt, response)
+            if last or not _retry_fits(deadline, delay):
+                return response
+            logger.warning("remote adapter got status %s; retrying in %.2fs", response.status_code, delay)
+            response.close()
+        time.sleep(delay)
+        attempt += 1
+
+
+def _provider() -> str:
+    return (os.getenv("REMOTE_PROVIDER", "openai") or "openai").strip().lower()
+
+
+def _openai_model() -> str:
+    return os.getenv("REMOTE_OPENAI_MODEL", os.getenv("OPENAI_MODEL", "gpt-4.1"))
+
+
+def _openai_base_url() -> str:
+    return os.getenv("OPENAI_BASE_URL", os.getenv("REMOTE_OPENAI_BASE_URL", "https://api.openai.com/v1")).rstrip("/")
+
+
+def _google_model() -> str:
+    return os.getenv("REMOTE_GOOGLE_MODEL", os.getenv("GOOGLE_MODEL", "gemini-1.5-pro-latest"))
+
 
+def _google_base_url() -> str:
+    return os.getenv("GOOGLE_API_BASE", "https://generativelanguage.googleapis.com").rstrip("/")
 
-def _schema_path() -> Path:
-    return Path(__file__).resolve().parents[1] / "contracts" / "planner_output.schema.json"
+
+def backend_id() -> str:
+    """Describe the provider, model and endpoint call_remote_planner would use right now.
+
+    Settings are read from the environment on every call, so callers that cache remote plans
+    key on this to avoid serving answers from a previously configured model.
+    """
+    provider = _provider()
+    if provider == "openai":
+        return f"openai:{_openai_model()}@{_openai_base_url()}"
+    if provider == "google":
+        return f"google:{_google_model()}@{_google_base_url()}"
+    return provider
+
+
+def _prewarm_connection() -> None:
+    # Open the TCP/TLS connection to the configured provider ahead of the first planner call.
+    try:
+        provider = _provider()
+        if provider == "openai":
+            _http_session().get(f"{_openai_base_url()}/models", headers=_openai_headers(), timeout=5).close()
+        elif provider == "google":
+            _http_session().get(f"{_google_base_url()}/v1beta/models", params={"key": os.getenv("GOOGLE_API_KEY", "")}, timeout=5).close()
+    except Exception:
+        pass
+
+
+def _async_http() -> Any:
+    # httpx pools are bound to the event loop that opened them, so keep one client per loop. The
+    # cache is keyed weakly: once a loop (e.g. one from asyncio.run) is gone, its client and
+    # sockets are released with it instead of piling up.
+    httpx = _httpx()
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_HTTP.get(loop)
+    if client is None or client.is_closed:
+        limits = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0)
+        # HTTP/2 lets concurrent async planner calls share one TLS connection; it needs the optional h2
+        # package. Only this async client negotiates it: call_remote_planner stays on requests (HTTP/1.1).
+        http2 = os.getenv("REMOTE_HTTP2", "1") != "0" and _optional_module("h2") is not None
+        client = httpx.AsyncClient(limits=limits, http2=http2)
+        _ASYNC_HTTP[loop] = client
+    return client
+
+
+async def _apost_with_retry(url: str, timeout: int, **kwargs: Any) -> Any:
+    """Async counterpart of _post_with_retry on the shared httpx client, with the same total budget."""
+    httpx = _httpx()
+    client = _async_http()
+    deadline = time.monotonic() + timeout
+    attempts = _retry_attempts()
+    attempt = 0
+    while True:
+        last = attempt >= attempts - 1
+        try:
+            response = await client.post(url, timeout=_attempt_timeout(deadline), **kwargs)
+        except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError) as exc:
+            delay = _retry_delay(attempt, None)
+            if last or not _retry_fits(deadline, delay):
+                raise
+            logger.warning("remote adapter request failed (%s); retrying in %.2fs", exc.__class__.__name__, delay)
+        else:
+            if response.status_code not in _RETRY_STATUSES:
+                return response
+            delay = _retry_delay(attempt, response)
+            if last or not _retry_fits(deadline, delay):
+                return response
+            logger.warning("remote adapter got status %s; retrying in %.2fs", response.status_code, delay)
+            await response.aclose()
+        await asyncio.sleep(delay)
+        attempt += 1
 
 
 def _planner_schema() -> Dict[str, Any]:
-    global _SCHEMA_CACHE
+    global _SCHEMA_CACHE, _REQUIRED, _PROPERTIES, _ADDITIONAL
     if _SCHEMA_CACHE is None:
-        _SCHEMA_CACHE = json.loads(_schema_path().read_text(encoding="utf-8"))
+        schema = json.loads(_SCHEMA_PATH.read_text(encoding="utf-8"))
+        # The schema never changes after load, so its top-level fields are snapshotted once.
+        _REQUIRED = tuple(schema.get("required", ()))
+        _PROPERTIES = schema.get("properties", {})
+        _ADDITIONAL = schema.get("additionalProperties", False)
+        _SCHEMA_CACHE = schema
     return _SCHEMA_CACHE
 
 
 def _function_parameters_schema() -> Dict[str, Any]:
-    schema = _planner_schema()
-    return {
-        "type": "object",
-        "properties": schema.get("properties", {}),
-        "required": schema.get("required", []),
-        "additionalProperties": schema.get("additionalProperties", False),
-    }
+    global _PARAMETERS_SCHEMA_CACHE
+    if _PARAMETERS_SCHEMA_CACHE is None:
+        _planner_schema()
+        _PARAMETERS_SCHEMA_CACHE = {
+            "type": "object",
+            "properties": _PROPERTIES,
+            "required": list(_REQUIRED),
+            "additionalProperties": _ADDITIONAL,
+        }
+    return _PARAMETERS_SCHEMA_CACHE
+
+
+def _openai_tools() -> List[Dict[str, Any]]:
+    global _OPENAI_TOOLS_CACHE
+    if _OPENAI_TOOLS_CACHE is None:
+        _OPENAI_TOOLS_CACHE = [
+            {
+                "type": "function",
+                "function": {
+                    "name": "emit_plan",
+                    "description": "Return the planner output. Follow the parameters schema exactly.",
+                    "parameters": _function_parameters_schema(),
+                },
+            }
+        ]
+    return _OPENAI_TOOLS_CACHE
+
+
+def _google_tools() -> List[Dict[str, Any]]:
+    global _GOOGLE_TOOLS_CACHE
+    if _GOOGLE_TOOLS_CACHE is None:
+        _GOOGLE_TOOLS_CACHE = [
+            {
+                "functionDeclarations": [
+                    {"name": "emit_plan", "description": "Emit planner output", "parameters": _function_parameters_schema()}
+                ]
+            }
+        ]
+    return _GOOGLE_TOOLS_CACHE
+
+
+def _planner_validator() -> Callable[[Dict[str, Any]], Any]:
+    global _VALIDATOR_CACHE
+    if _VALIDATOR_CACHE is not None:
+        return _VALIDATOR_CACHE
+    if fastjsonschema is not None:
+        _VALIDATOR_CACHE = fastjsonschema.compile(_planner_schema())
+    elif _optional_module("jsonschema") is not None:
+        # The schema is checked against the meta-schema once here; the bound validator skips it
+        # per call, and the flat PlannerOutput schema needs neither $ref resolution nor formats.
+        validator_cls = _optional_module("jsonschema").Draft7Validator
+        validator_cls.check_schema(_planner_schema())
+        _VALIDATOR_CACHE = validator_cls(_planner_schema(), format_checker=None).validate
+    else:
+        raise RuntimeError("fastjsonschema or jsonschema is required to validate remote planner output")
+    return _VALIDATOR_CACHE
+
+
+def _fast_check(payload: Any) -> str | None:
+    """Return the first PlannerOutput field that does not conform, or None if the payload is valid."""
+    if not isinstance(payload, dict):
+        return "<root>"
+    if _SCHEMA_CACHE is None:
+        _planner_schema()
+    for key in _REQUIRED:
+        if key not in payload:
+            return key
+    if _ADDITIONAL is False:
+        for key in payload:
+            if key not in _PROPERTIES:
+                return key
+    if not isinstance(payload["intent"], str):
+        return "intent"
+    if not isinstance(payload["slots"], dict):
+        return "slots"
+    confidence = payload["confidence"]
+    if isinstance(confidence, bool) or not isinstance(confidence, (int, float)) or not 0 <= confidence <= 1:
+        return "confidence"
+    sources = payload["sources"]
+    if not isinstance(sources, list) or not all(isinstance(source, str) for source in sources):
+        return "sources"
+    steps = payload["steps"]
+    if not isinstance(steps, list) or not steps:
+        return "steps"
+    for step in steps:
+        if not isinstance(step, dict) or len(step) != len(_STEP_KEYS):
+            return "steps"
+        for key in _STEP_KEYS:
+            if key not in step:
+                return f"steps.{key}"
+        if not isinstance(step["step_label"], str) or not isinstance(step["api_call"], str):
+            return "steps"
+        if not isinstance(step["args"], dict) or not isinstance(step["expected_state"], dict):
+            return "steps"
+    return None
 
 
 def _validate_plan(payload: Dict[str, Any]) -> None:
-    schema = _planner_schema()
-    if jsonschema is None:
-        raise RuntimeError("jsonschema is required to validate remote planner output")
-    jsonschema.Draft7Validator(schema).validate(payload)
+    # Well-formed plans are accepted by the hand-rolled check; the full validator
+    # only runs when that check objects, to confirm the failure and describe it.
+    if _fast_check(payload) is None:
+        return
+    validate = _planner_validator()
+    if fastjsonschema is None:
+        validate(payload)
+        return
+    try:
+        validate(payload)
+    except fastjsonschema.JsonSchemaException as exc:
+        raise ValueError(f"planner output failed schema validation: {exc}") from exc
 
 
 def _mask_secret(value: str | None) -> str:
@@ -67,7 +424,7 @@ def _mask_secret(value: str | None) -> str:
 
 def _safe_json(obj: Any, limit: int = 4000) -> str:
     try:
-        text = json.dumps(obj, ensure_ascii=False)
+        text = _dumps(obj)
     except Exception:
         text = str(obj)
     if len(text) > limit:
@@ -75,21 +432,37 @@ def _safe_json(obj: Any, limit: int = 4000) -> str:
     return text
 
 
+def _log_response(provider: str, status: int, body: str | bytes, kind: str = "body") -> None:
+    # INFO only records a size/hash fingerprint; the body itself is serialized only when DEBUG is on.
+    raw = body.encode("utf-8") if isinstance(body, str) else body
+    logger.info(
+        "remote adapter response provider=%s status=%s %s_bytes=%s sha1=%s",
+        provider,
+        status,
+        kind,
+        len(raw),
+        hashlib.sha1(raw).hexdigest()[:12],
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("remote adapter response provider=%s %s=%s", provider, kind, _safe_json(raw.decode("utf-8", "replace")))
+
+
 def _parse_json_fragment(text: str) -> Dict[str, Any] | None:
     stripped = (text or "").strip()
     if not stripped:
         return None
-    try:
-        return json.loads(stripped)
-    except json.JSONDecodeError:
+    # Trim any prose or markdown fence around the outermost object first, so
+    # wrapped output is parsed once instead of failing and being re-parsed.
+    if stripped[0] != "{" or stripped[-1] != "}":
         start = stripped.find("{")
         end = stripped.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            try:
-                return json.loads(stripped[start : end + 1])
-            except json.JSONDecodeError:
-                return None
-    return None
+        if start == -1 or end <= start:
+            return None
+        stripped = stripped[start : end + 1]
+    try:
+        return _loads(stripped)
+    except ValueError:
+        return None
 
 
 def _openai_headers() -> Dict[str, str]:
@@ -120,69 +493,97 @@ def _masked_headers(headers: Dict[str, str]) -> Dict[str, str]:
     return masked
 
 
-def _common_messages(retrieval_snippets: List[Any], state_snapshot: Dict[str, Any], user_query: str) -> Dict[str, Any]:
+def _user_content(retrieval_snippets: List[Any], state_snapshot: Dict[str, Any], user_query: str) -> str:
     payload = {
         "user_query": user_query,
         "retrieval_snippets": retrieval_snippets,
         "state_snapshot": state_snapshot,
     }
-    system_text = (
-        "You are a deterministic planning engine. "
-        "Return only a single JSON object that matches the PlannerOutput schema in contracts/planner_output.schema.json. "
-        "Do not include any text outside the JSON object and do not invent additional fields."
-    )
-    return {"system_text": system_text, "user_payload": payload}
+    return _dumps(payload)
 
 
-def _call_openai(
-    retrieval_snippets: List[Any], state_snapshot: Dict[str, Any], user_query: str, timeout_seconds: int
-) -> Dict[str, Any]:
-    prompts = _common_messages(retrieval_snippets, state_snapshot, user_query)
-    parameters_schema = _function_parameters_schema()
-    model = os.getenv("REMOTE_OPENAI_MODEL", os.getenv("OPENAI_MODEL", "gpt-4.1"))
-    base_url = os.getenv("OPENAI_BASE_URL", os.getenv("REMOTE_OPENAI_BASE_URL", "https://api.openai.com/v1")).rstrip("/")
+def _openai_stream_message(lines: Iterable[str | bytes]) -> Dict[str, Any]:
+    """Assemble a chat completion message from server-sent event deltas."""
+    content_parts: List[str] = []
+    argument_parts: List[str] = []
+    for raw in lines:
+        line = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:") :].strip()
+        if data == "[DONE]":
+            break
+        try:
+            chunk = _loads(data)
+        except ValueError:
+            # A truncated or garbled event; any resulting gap surfaces when the plan is parsed.
+            logger.warning("remote adapter skipped undecodable stream event (%s chars)", len(data))
+            continue
+        for choice in chunk.get("choices") or []:
+            if choice.get("index", 0) != 0:
+                continue
+            delta = choice.get("delta") or {}
+            if delta.get("content"):
+                content_parts.append(delta["content"])
+            for call in delta.get("tool_calls") or []:
+                arguments = (call.get("function") or {}).get("arguments")
+                if arguments and call.get("index", 0) == 0:
+                    argument_parts.append(arguments)
+    message: Dict[str, Any] = {"content": "".join(content_parts)}
+    if argument_parts:
+        message["tool_calls"] = [{"function": {"arguments": "".join(argument_parts)}}]
+    return message
+
+
+def _openai_request(
+    retrieval_snippets: List[Any], state_snapshot: Dict[str, Any], user_query: str, stream: bool
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    model = _openai_model()
+    base_url = _openai_base_url()
     url = f"{base_url}/chat/completions"
 
     messages = [
-        {"role": "system", "content": prompts["system_text"]},
-        {"role": "user", "content": json.dumps(prompts["user_payload"], ensure_ascii=False)},
+        _OPENAI_SYSTEM_MSG,
+        {"role": "user", "content": _user_content(retrieval_snippets, state_snapshot, user_query)},
     ]
     payload = {
         "model": model,
         "messages": messages,
         "temperature": 0,
-        "tools": [
-            {
-                "type": "function",
-                "function": {
-                    "name": "emit_plan",
-                    "description": "Return the planner output. Follow the parameters schema exactly.",
-                    "parameters": parameters_schema,
-                },
-            }
-        ],
-        "tool_choice": {"type": "function", "function": {"name": "emit_plan"}},
         "response_format": {"type": "json_object"},
     }
+    # json_object mode returns the plan in message.content; the function-calling block (which
+    # repeats the whole schema) is only sent for older models that need it.
+    if os.getenv("OPENAI_FORCE_TOOLS", "0") == "1":
+        payload["tools"] = _openai_tools()
+        payload["tool_choice"] = _OPENAI_TOOL_CHOICE
 
     headers = _openai_headers()
     logger.info(
-        "remote adapter request provider=openai model=%s url=%s headers=%s payload=%s",
+        "remote adapter request provider=openai model=%s url=%s headers=%s user_chars=%s",
         model,
         url,
         _masked_headers(headers),
-        _safe_json({"messages": messages, "model": model, "tools": payload["tools"], "response_format": payload["response_format"]}),
+        len(messages[1]["content"]),
     )
-    response = requests.post(url, headers=headers, json=payload, timeout=timeout_seconds)
-    logger.info("remote adapter response provider=openai status=%s body=%s", response.status_code, _safe_json(response.text))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("remote adapter request provider=openai payload=%s", _safe_json(payload))
+    if stream:
+        payload["stream"] = True
+    return url, headers, payload
+
+
+def _openai_body_message(response: Any) -> Dict[str, Any]:
+    _log_response("openai", response.status_code, response.content)
     response.raise_for_status()
-    data = response.json()
+    data = _loads(response.content)
     choices = data.get("choices") or []
     if not choices:
         raise RuntimeError("no choices returned from OpenAI")
-    message = choices[0].get("message", {})
-    parsed: Dict[str, Any] | None = None
+    return choices[0].get("message", {})
 
+
+def _openai_plan(message: Dict[str, Any]) -> Dict[str, Any]:
     content = message.get("content", "")
     parsed = _parse_json_fragment(content) if content else None
 
@@ -201,32 +602,56 @@ def _call_openai(
     return parsed
 
 
-def _call_google(
+def _call_openai(
     retrieval_snippets: List[Any], state_snapshot: Dict[str, Any], user_query: str, timeout_seconds: int
 ) -> Dict[str, Any]:
-    prompts = _common_messages(retrieval_snippets, state_snapshot, user_query)
-    parameters_schema = _function_parameters_schema()
+    stream = (os.getenv("REMOTE_OPENAI_STREAM", "1") or "1").strip() != "0"
+    url, headers, payload = _openai_request(retrieval_snippets, state_snapshot, user_query, stream)
+    response = _post_with_retry(url, timeout_seconds, headers=headers, json=payload, stream=stream)
+    if stream and response.ok:
+        with response:
+            message = _openai_stream_message(response.iter_lines())
+        streamed = message["content"] + "".join(call["function"]["arguments"] for call in message.get("tool_calls", []))
+        _log_response("openai", response.status_code, streamed, kind="streamed")
+    else:
+        message = _openai_body_message(response)
+    return _openai_plan(message)
+
+
+def _google_request(
+    retrieval_snippets: List[Any], state_snapshot: Dict[str, Any], user_query: str
+) -> Tuple[str, Dict[str, Any]]:
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         raise RuntimeError("GOOGLE_API_KEY is required for REMOTE_PROVIDER=google")
-    model = os.getenv("REMOTE_GOOGLE_MODEL", os.getenv("GOOGLE_MODEL", "gemini-1.5-pro-latest"))
-    base_url = os.getenv("GOOGLE_API_BASE", "https://generativelanguage.googleapis.com")
-    url = f"{base_url.rstrip('/')}/v1beta/models/{model}:generateContent?key={api_key}"
+    model = _google_model()
+    base_url = _google_base_url()
+    url = f"{base_url}/v1beta/models/{model}:generateContent?key={api_key}"
     masked_url = url.replace(api_key, _mask_secret(api_key))
 
     payload = {
-        "systemInstruction": {"parts": [{"text": prompts["system_text"]}]},
-        "contents": [{"role": "user", "parts": [{"text": json.dumps(prompts["user_payload"], ensure_ascii=False)}]}],
-        "tools": [{"functionDeclarations": [{"name": "emit_plan", "description": "Emit planner output", "parameters": parameters_schema}]}],
-        "toolConfig": {"functionCallConfig": {"mode": "ANY", "allowedFunctionNames": ["emit_plan"]}},
+        "systemInstruction": _GOOGLE_SYSTEM_INSTRUCTION,
+        "contents": [{"role": "user", "parts": [{"text": _user_content(retrieval_snippets, state_snapshot, user_query)}]}],
+        "tools": _google_tools(),
+        "toolConfig": _GOOGLE_TOOL_CONFIG,
         "generationConfig": {"temperature": 0},
     }
 
-    logger.info("remote adapter request provider=google model=%s url=%s payload=%s", model, masked_url, _safe_json(payload))
-    response = requests.post(url, json=payload, timeout=timeout_seconds)
-    logger.info("remote adapter response provider=google status=%s body=%s", response.status_code, _safe_json(response.text))
+    logger.info(
+        "remote adapter request provider=google model=%s url=%s user_chars=%s",
+        model,
+        masked_url,
+        len(payload["contents"][0]["parts"][0]["text"]),
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("remote adapter request provider=google payload=%s", _safe_json(payload))
+    return url, payload
+
+
+def _google_plan(response: Any) -> Dict[str, Any]:
+    _log_response("google", response.status_code, response.content)
     response.raise_for_status()
-    data = response.json()
+    data = _loads(response.content)
     candidates = data.get("candidates") or []
     if not candidates:
         raise RuntimeError("no candidates returned from Google")
@@ -254,6 +679,37 @@ def _call_google(
     return parsed
 
 
+def _call_google(
+    retrieval_snippets: List[Any], state_snapshot: Dict[str, Any], user_query: str, timeout_seconds: int
+) -> Dict[str, Any]:
+    url, payload = _google_request(retrieval_snippets, state_snapshot, user_query)
+    return _google_plan(_post_with_retry(url, timeout_seconds, json=payload))
+
+
+async def _acall_openai(
+    retrieval_snippets: List[Any], state_snapshot: Dict[str, Any], user_query: str, timeout_seconds: int
+) -> Dict[str, Any]:
+    url, headers, payload = _openai_request(retrieval_snippets, state_snapshot, user_query, stream=False)
+    response = await _apost_with_retry(url, timeout_seconds, headers=headers, json=payload)
+    return _openai_plan(_openai_body_message(response))
+
+
+async def _acall_google(
+    retrieval_snippets: List[Any], state_snapshot: Dict[str, Any], user_query: str, timeout_seconds: int
+) -> Dict[str, Any]:
+    url, payload = _google_request(retrieval_snippets, state_snapshot, user_query)
+    return _google_plan(await _apost_with_retry(url, timeout_seconds, json=payload))
+
+
+def _log_validated(provider: str, plan: Dict[str, Any]) -> None:
+    logger.info(
+        "remote adapter validated provider=%s confidence=%s steps=%s",
+        provider,
+        plan.get("confidence"),
+        len(plan.get("steps", [])) if isinstance(plan.get("steps"), list) else 0,
+    )
+
+
 def call_remote_planner(
     retrieval_snippets: List[Any],
     state_snapshot: Dict[str, Any],
@@ -267,7 +723,7 @@ def call_remote_planner(
     """
     _ensure_logger()
     timeout_seconds = int(kwargs.pop("timeout_seconds", timeout) or timeout)
-    provider = (os.getenv("REMOTE_PROVIDER", "openai") or "openai").strip().lower()
+    provider = _provider()
     try:
         if provider == "openai":
             plan = _call_openai(retrieval_snippets, state_snapshot, user_query, timeout_seconds)
@@ -277,21 +733,73 @@ def call_remote_planner(
             raise ValueError(f"unsupported REMOTE_PROVIDER '{provider}'")
 
         _validate_plan(plan)
-        logger.info(
-            "remote adapter validated provider=%s confidence=%s steps=%s",
-            provider,
-            plan.get("confidence"),
-            len(plan.get("steps", [])) if isinstance(plan.get("steps"), list) else 0,
-        )
+        _log_validated(provider, plan)
         return plan
     except Exception as exc:
         logger.exception("remote planner failed for provider %s", provider)
         raise RuntimeError(f"Remote planner failed for provider '{provider}': {exc}") from exc
 
 
+async def acall_remote_planner(
+    retrieval_snippets: List[Any],
+    state_snapshot: Dict[str, Any],
+    user_query: str,
+    timeout: int = 10,
+    providers: Sequence[str] | None = None,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """
+    Async variant of call_remote_planner. When several providers are given (or listed comma-separated
+    in REMOTE_PROVIDERS) they are raced; the first schema-valid plan wins and the others are cancelled.
+    """
+    _ensure_logger()
+    timeout_seconds = int(kwargs.pop("timeout_seconds", timeout) or timeout)
+    if providers is None:
+        providers = (os.getenv("REMOTE_PROVIDERS") or os.getenv("REMOTE_PROVIDER", "openai") or "openai").split(",")
+    names = [p.strip().lower() for p in providers if p and p.strip()]
+    if not names:
+        raise ValueError("no remote planner providers configured")
+    calls = {"openai": _acall_openai, "google": _acall_google}
+
+    async def attempt(provider: str) -> Dict[str, Any]:
+        call = calls.get(provider)
+        if call is None:
+            raise ValueError(f"unsupported REMOTE_PROVIDER '{provider}'")
+        plan = await call(retrieval_snippets, state_snapshot, user_query, timeout_seconds)
+        _validate_plan(plan)
+        return plan
+
+    pending = {asyncio.ensure_future(attempt(name)): name for name in names}
+    errors: List[str] = []
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                provider = pending.pop(task)
+                exc = task.exception()
+                if exc is None:
+                    plan = task.result()
+                    _log_validated(provider, plan)
+                    return plan
+                logger.error("remote planner failed for provider %s: %s", provider, exc)
+                errors.append(f"{provider}: {exc}")
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            # Reap the losers so they neither warn as destroyed-while-pending nor leave exceptions unretrieved.
+            await asyncio.gather(*pending, return_exceptions=True)
+    raise RuntimeError(f"Remote planner failed for providers {names}: {'; '.join(errors)}")
+
+
 def minimal_sanity_check(planner_output: Dict[str, Any]) -> bool:
     try:
         _validate_plan(planner_output)
         return True
     except Exception:
         return False
+
+
+if os.getenv("PREWARM_REMOTE", "0") == "1":
+    _http_session()  # create the shared session here so the thread and the first call cannot race on it
+    threading.Thread(target=_prewarm_connection, name="remote-adapter-prewarm", daemon=True).start()
@@ -7,9 +7,35 @@ import sys
 import time
 from pathlib import Path
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
 REPORT_DIR = Path("reports/master_run")
 RESULT_PATH = REPORT_DIR / "planner_results.json"
 
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+try:
+    from planner.runner import run_planner
+    _RUNNER_IMPORT_ERROR: Exception | None = None
+except Exception as exc:  # pragma: no cover - reported by _planner_smoke
+    run_planner = None  # type: ignore
+    _RUNNER_IMPORT_ERROR = exc
+
+_SCHEMA_CACHE: dict | None = None
+
+
+def _load_schema(schema_path: Path) -> dict:
+    global _SCHEMA_CACHE
+    if _SCHEMA_CACHE is None:
+        raw = schema_path.read_bytes()
+        _SCHEMA_CACHE = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    return _SCHEMA_CACHE
+
 
 def _schema_check(tests: list[dict]) -> bool:
     schema_ok = False
@@ -17,7 +43,7 @@ def _schema_check(tests: list[dict]) -> bool:
     schema_path = Path("contracts/planner_output.schema.json")
     try:
         if schema_path.exists():
-            json.load(schema_path.open())
+            _load_schema(schema_path)
             schema_ok = True
             note = "schema loaded"
         else:
@@ -32,11 +58,8 @@ def _planner_smoke(tests: list[dict]) -> bool:
     smoke_ok = False
     note = ""
     try:
-        repo_root = Path(__file__).resolve().parents[1]
-        if str(repo_root) not in sys.path:
-            sys.path.insert(0, str(repo_root))
-        from planner.runner import run_planner  # lazy import to avoid import cost
-
+        if run_planner is None:
+            raise RuntimeError(f"planner.runner import failed: {_RUNNER_IMPORT_ERROR}")
         plan = run_planner(["stub context"], {"windows": [], "settings": {}, "logs": []}, "ping clipboard")
         smoke_ok = bool(plan)
         note = "planner returned payload"
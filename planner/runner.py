@@ -1,16 +1,29 @@
 import copy
+import functools
 import hashlib
 import json
 import logging
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Dict, List
 
 from planner.fallback import fallback_plan
 from planner.prompt import build_prompt
-from planner.schema import Plan
+from planner.schema import Plan, Step
 from telemetry.logger import log_event
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import fastjsonschema  # type: ignore
+except ImportError:  # pragma: no cover
+    fastjsonschema = None  # type: ignore
+
 try:
     import jsonschema
 except ImportError:  # pragma: no cover
@@ -29,22 +42,59 @@ except Exception:  # pragma: no cover - optional dependency
 
 _LLM = None
 logger = logging.getLogger(__name__)
+_PLAN_CACHE: "OrderedDict[str, Plan]" = OrderedDict()
+_PREVIEW_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_PLAN_CACHE_SIZE = max(int(os.getenv("PLANNER_CACHE_SIZE", "512")), 1)
+_PLAN_CACHE_LOCK = threading.Lock()
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the same exception either way.
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 
 def _schema_path() -> Path:
     return Path(__file__).resolve().parents[1] / "contracts" / "planner_output.schema.json"
 
 
+@functools.lru_cache(maxsize=1)
 def _load_schema() -> Dict[str, Any]:
     with open(_schema_path(), "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+_SCHEMA = _load_schema()
+
+
+def _compiled_validator():
+    if fastjsonschema is None:
+        return None
+    # Prefer the checked-in validator (scripts/regen_plan_validator.py) to skip codegen at import,
+    # but only while it was generated from the schema currently on disk.
+    try:
+        from planner import _runner_validator_generated as generated
+    except ImportError:
+        generated = None
+    canonical = json.dumps(_SCHEMA, sort_keys=True, separators=(",", ":"))
+    if generated is not None and generated.SCHEMA_SHA256 == hashlib.sha256(canonical.encode("utf-8")).hexdigest():
+        return generated.validate
+    return fastjsonschema.compile(_SCHEMA)
+
+
+_FAST_VALIDATE = _compiled_validator()
+_VALIDATOR_SINGLETON = jsonschema.Draft7Validator(_SCHEMA) if _FAST_VALIDATE is None and jsonschema is not None else None
+# The manual fallback in _validate_with_schema only checks keys, not value types.
+_FULL_SCHEMA_VALIDATION = _FAST_VALIDATE is not None or jsonschema is not None
+
+
 def _validate_with_schema(payload: Dict[str, Any]) -> None:
-    schema = _load_schema()
-    if jsonschema is not None:
-        jsonschema.Draft7Validator(schema).validate(payload)
+    if _FAST_VALIDATE is not None:
+        try:
+            _FAST_VALIDATE(payload)
+        except fastjsonschema.JsonSchemaException as exc:
+            raise ValueError(str(exc)) from exc
         return
+    if _VALIDATOR_SINGLETON is not None:
+        _VALIDATOR_SINGLETON.validate(payload)
+        return
+    schema = _SCHEMA
     required = schema.get("required", [])
     allowed_root = set(schema.get("properties", {}).keys())
     unexpected_root = set(payload.keys()) - allowed_root
@@ -65,6 +115,25 @@ def _validate_with_schema(payload: Dict[str, Any]) -> None:
             raise ValueError(f"unexpected step fields: {sorted(unexpected_step)}")
 
 
+def _plan_model(raw_plan: Dict[str, Any]) -> Plan:
+    if not _FULL_SCHEMA_VALIDATION:
+        return Plan.model_validate(raw_plan)
+    # The plan already passed the full PlannerOutput schema, which pins every field's type,
+    # so build the models directly instead of re-validating with pydantic. model_construct keeps
+    # references, so copy the containers the way model_validate would; raw_plan may share them
+    # with the caller's snippets or the fallback's state.
+    steps = [
+        Step.model_construct(**{**step, "args": dict(step["args"]), "expected_state": dict(step["expected_state"])})
+        for step in raw_plan["steps"]
+    ]
+    fields = {**raw_plan, "steps": steps, "confidence": float(raw_plan["confidence"])}
+    if "slots" in fields:
+        fields["slots"] = dict(fields["slots"])
+    if "sources" in fields:
+        fields["sources"] = list(fields["sources"])
+    return Plan.model_construct(**fields)
+
+
 def _validation_failure_response(user_query: str) -> Dict[str, Any]:
     return {
         "intent": user_query,
@@ -85,6 +154,57 @@ def _hash_plan_output(plan: Any) -> str:
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
+def _log_planner_output(plan: Any) -> None:
+    try:
+        log_event({"event": "planner_output", "planner_output_hash": _hash_plan_output(plan)})
+    except Exception:
+        pass
+
+
+def _cache_digest(parts: List[Any]) -> str | None:
+    try:
+        if orjson is not None:
+            raw = orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)
+        else:
+            raw = json.dumps(parts, sort_keys=True).encode("utf-8")
+    except (TypeError, ValueError):
+        return None
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _plan_cache_key(retrieval_snippets: List[str], state_snapshot: Dict[str, Any], user_query: str) -> str | None:
+    if os.getenv("PLANNER_CACHE_DISABLE", "0") == "1":
+        return None
+    # The remote toggle and the remote provider/model/endpoint change which backend answers,
+    # so they are part of the key.
+    use_remote = (os.getenv("USE_REMOTE_MODEL") or "").strip() == "1" and remote_adapter is not None
+    backend = remote_adapter.backend_id() if use_remote else None
+    return _cache_digest([user_query, retrieval_snippets, state_snapshot, use_remote, backend])
+
+
+def _preview_cache_key(plan: Plan, live_state: Dict[str, Any]) -> str | None:
+    if os.getenv("PLANNER_CACHE_DISABLE", "0") == "1":
+        return None
+    # dry_run simulates against the live mock_os state, not the snapshot the plan was built
+    # from, so the preview is keyed on the plan and that live state.
+    return _cache_digest([plan.model_dump(), live_state])
+
+
+def _cache_get(cache: "OrderedDict[str, Any]", key: str) -> Any:
+    with _PLAN_CACHE_LOCK:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+    return copy.deepcopy(value) if value is not None else None
+
+
+def _cache_put(cache: "OrderedDict[str, Any]", key: str, value: Any) -> None:
+    with _PLAN_CACHE_LOCK:
+        cache[key] = copy.deepcopy(value)
+        while len(cache) > _PLAN_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
 def _load_llm():
     global _LLM
     if _LLM is not None or Llama is None:
@@ -110,13 +230,13 @@ def _parse_json(text: str) -> Dict[str, Any] | None:
     if not stripped:
         return None
     try:
-        return json.loads(stripped)
+        return _json_loads(stripped)
     except json.JSONDecodeError:
         start = stripped.find("{")
         end = stripped.rfind("}")
         if start != -1 and end != -1 and end > start:
             try:
-                return json.loads(stripped[start : end + 1])
+                return _json_loads(stripped[start : end + 1])
             except json.JSONDecodeError:
                 return None
     return None
@@ -192,6 +312,22 @@ def _deterministic_plan(retrieval_snippets: List[str], state_snapshot: Dict[str,
 
 
 def run_planner(retrieval_snippets: List[str], state_snapshot: Dict[str, Any], user_query: str):
+    cache_key = _plan_cache_key(retrieval_snippets, state_snapshot, user_query)
+    if cache_key is not None:
+        plan_obj = _cache_get(_PLAN_CACHE, cache_key)
+        if plan_obj is not None:
+            _log_planner_output(plan_obj)
+            return plan_obj
+
+    plan_obj, from_model = _run_planner_uncached(retrieval_snippets, state_snapshot, user_query)
+    # Only model-produced plans are cached; fallbacks and failures are cheap to rebuild and
+    # must not mask a model that recovers on the next call.
+    if cache_key is not None and from_model:
+        _cache_put(_PLAN_CACHE, cache_key, plan_obj)
+    return plan_obj
+
+
+def _run_planner_uncached(retrieval_snippets: List[str], state_snapshot: Dict[str, Any], user_query: str):
     prompt = build_prompt(retrieval_snippets, state_snapshot, user_query)
     use_remote = (os.getenv("USE_REMOTE_MODEL") or "").strip() == "1" and remote_adapter is not None
     model_plan = None
@@ -226,34 +362,26 @@ def run_planner(retrieval_snippets: List[str], state_snapshot: Dict[str, Any], u
         except Exception as fallback_exc:
             logger.error("fallback validation failed: %s", fallback_exc)
             failure = _validation_failure_response(user_query)
-            try:
-                log_event({"event": "planner_output", "planner_output_hash": _hash_plan_output(failure)})
-            except Exception:
-                pass
-            return failure
+            _log_planner_output(failure)
+            return failure, False
 
     if not used_fallback:
         confidence = float(raw_plan.get("confidence", 0.0) or 0.0)
         if confidence < 0.5:
             logger.warning("low confidence %.3f; using fallback", confidence)
+            used_fallback = True
             raw_plan = fallback_plan(retrieval_snippets, state_snapshot, user_query)
             try:
                 _validate_with_schema(raw_plan)
             except Exception as exc:
                 logger.error("fallback validation failed: %s", exc)
                 failure = _validation_failure_response(user_query)
-                try:
-                    log_event({"event": "planner_output", "planner_output_hash": _hash_plan_output(failure)})
-                except Exception:
-                    pass
-                return failure
+                _log_planner_output(failure)
+                return failure, False
 
-    plan_obj = Plan.model_validate(raw_plan)
-    try:
-        log_event({"event": "planner_output", "planner_output_hash": _hash_plan_output(plan_obj)})
-    except Exception:
-        pass
-    return plan_obj
+    plan_obj = _plan_model(raw_plan)
+    _log_planner_output(plan_obj)
+    return plan_obj, not used_fallback
 
 
 def run_planner_with_preview(
@@ -263,7 +391,20 @@ def run_planner_with_preview(
     if isinstance(plan, dict) and plan.get("error") == "VALIDATION_FAIL":
         return {"plan": plan, "dry_run": None}
 
-    from mock_os.executor import dry_run  # local import to avoid cycle
+    from mock_os import state  # local import to avoid cycle
+    from mock_os.executor import dry_run
+
+    cache_key = _preview_cache_key(plan, state.STATE)
+    if cache_key is not None:
+        preview = _cache_get(_PREVIEW_CACHE, cache_key)
+        if preview is not None:
+            try:
+                log_event({"event": "dry_run", "dry_run_diff": preview["diff"]})
+            except Exception:
+                pass
+            return {"plan": plan, "dry_run": preview}
 
     preview = dry_run(plan)
+    if cache_key is not None:
+        _cache_put(_PREVIEW_CACHE, cache_key, preview)
     return {"plan": plan, "dry_run": preview}
@@ -15,27 +15,31 @@ except ImportError:  # pragma: no cover
 
 
 _LLAMA = None
+_HASH_DIM = 16
 
 
-def _hash_vector(text: str, dim: int = 16) -> List[float]:
+def _hash_vector(text: str, dim: int = _HASH_DIM) -> List[float]:
     digest = hashlib.sha256(text.encode("utf-8")).digest()
     vals = [int.from_bytes(digest[i : i + 2], "big") % 1000 for i in range(0, dim * 2, 2)]
     norm = float(sum(vals) or 1)
     return [v / norm for v in vals]
 
 
-def _load_llama() -> Any:
-    global _LLAMA
-    if _LLAMA is not None or Llama is None:
-        return _LLAMA
-    model_path = (
+def _model_path() -> str:
+    return (
         os.getenv("GPT_OSS_MODEL_PATH")
         or os.getenv("LLAMA_EMBED_MODEL")
         or os.getenv("LLAMA_MODEL_PATH")
         or os.path.join("models", "gpt-oss-20b.gguf")
         or "gpt-oss-20b.gguf"
     )
-    candidate = Path(model_path)
+
+
+def _load_llama() -> Any:
+    global _LLAMA
+    if _LLAMA is not None or Llama is None:
+        return _LLAMA
+    candidate = Path(_model_path())
     if not candidate.exists():
         return None
     try:
@@ -45,6 +49,13 @@ def _load_llama() -> Any:
     return _LLAMA
 
 
+def embed_backend() -> str:
+    """Identify the embedder embed_texts() resolves to, so stored vectors can be matched to it."""
+    if _load_llama() is not None:
+        return f"llama:{Path(_model_path()).resolve()}"
+    return f"hash:{_HASH_DIM}"
+
+
 def _embed_with_llama(llm: Any, text: str) -> List[float] | None:
     if hasattr(llm, "embed"):
         return llm.embed(text)  # type: ignore[attr-defined]
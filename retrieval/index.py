@@ -1,8 +1,11 @@
+import hashlib
 import json
+import os
 from pathlib import Path
 from typing import Any, List, Tuple
 
-from retrieval.embed import embed_texts
+from retrieval.embed import embed_backend, embed_texts
+from retrieval.index_persist import load_faiss, load_vectors, save_faiss, save_vectors, write_bytes_atomic
 from telemetry.logger import log_event
 
 try:
@@ -15,22 +18,118 @@ try:
 except ImportError:  # pragma: no cover
     np = None
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+_EMBED_BATCH_SIZE = 64
+_MANIFEST_NAME = "manifest.json"
+_DIM_PROBE = "dim probe"
+
 
 class _InMemoryIndex:
-    def __init__(self, dim: int):
+    def __init__(self, dim: int, capacity: int = 64):
         self.dim = dim
-        self.vectors: List[List[float]] = []
+        self._n = 0
+        if np is not None:
+            # Rows live in a preallocated buffer that doubles when full, so add() copies each
+            # vector once instead of re-concatenating the whole matrix.
+            self._buf = np.empty((max(capacity, 1), dim), dtype=np.float32)
+            self._sq = np.empty(max(capacity, 1), dtype=np.float32)
+        else:
+            self._buf = None
+            self._rows: List[List[float]] = []
+
+    @property
+    def ntotal(self) -> int:
+        return self._n if self._buf is not None else len(self._rows)
+
+    @property
+    def vectors(self) -> List[List[float]]:
+        return self.view().tolist() if self._buf is not None else self._rows
+
+    def view(self):
+        """Return the stored vectors as an (ntotal, dim) float32 array without copying; valid until the next add()."""
+        if self._buf is None:
+            raise RuntimeError("numpy is required for _InMemoryIndex.view()")
+        return self._buf[: self._n]
 
-    def add(self, vectors: List[List[float]]):
-        for v in vectors:
-            self.vectors.append(list(v))
+    @classmethod
+    def from_matrix(cls, matrix: Any, sq_norms: Any = None) -> "_InMemoryIndex":
+        """Wrap an existing (n, dim) float32 array, e.g. a read-only memmap, without copying it.
 
-    def search(self, queries: List[List[float]], k: int):
+        Pass the rows' squared norms when they are stored alongside the matrix; otherwise they are
+        recomputed, which reads every row.
+        """
+        index = cls(matrix.shape[1], capacity=1)
+        index._buf = matrix
+        index._sq = sq_norms if sq_norms is not None else np.einsum("ij,ij->i", matrix, matrix)
+        index._n = matrix.shape[0]
+        return index
+
+    @property
+    def sq_norms(self):
+        """Squared L2 norm of each stored row, aligned with view()."""
+        return self._sq[: self._n]
+
+    def _reserve(self, total: int) -> None:
+        capacity = self._buf.shape[0]
+        if total <= capacity:
+            return
+        # from_matrix() can wrap a 0-row matrix, so doubling must not start from zero.
+        capacity = max(capacity, 1)
+        while capacity < total:
+            capacity *= 2
+        buf = np.empty((capacity, self.dim), dtype=np.float32)
+        buf[: self._n] = self._buf[: self._n]
+        sq = np.empty(capacity, dtype=np.float32)
+        sq[: self._n] = self._sq[: self._n]
+        self._buf, self._sq = buf, sq
+
+    def add(self, vectors: Any):
+        if self._buf is None:
+            for v in vectors:
+                self._rows.append(list(v))
+            return
+        block = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if block.shape[0] == 0:
+            return
+        start, end = self._n, self._n + block.shape[0]
+        self._reserve(end)
+        self._buf[start:end] = block
+        # Squared norms are kept alongside the rows so search is a single matrix product.
+        self._sq[start:end] = np.einsum("ij,ij->i", block, block)
+        self._n = end
+
+    def search(self, queries: Any, k: int):
+        if self._buf is None:
+            return self._search_python(queries, k)
+        q = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        mat, sq = self._buf[: self._n], self._sq[: self._n]
+        n = self._n
+        k = min(k, n)
+        if k <= 0:
+            return np.empty((len(q), 0), dtype=np.float32), np.empty((len(q), 0), dtype=np.int64)
+        # ||q - v||^2 = ||q||^2 - 2 q.v + ||v||^2, evaluated for every (query, vector) pair at once.
+        dists = sq[None, :] - 2.0 * (q @ mat.T) + np.einsum("ij,ij->i", q, q)[:, None]
+        np.maximum(dists, 0.0, out=dists)
+        if k < n:
+            ids = np.argpartition(dists, k - 1, axis=1)[:, :k]
+        else:
+            ids = np.broadcast_to(np.arange(n), (len(q), n))
+        top = np.take_along_axis(dists, ids, axis=1)
+        # Order by distance, then by insertion order, like the stable sort of the pure-Python path.
+        order = np.lexsort((ids, top), axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(ids, order, axis=1).astype(np.int64)
+
+    def _search_python(self, queries: List[List[float]], k: int):
         results = []
         for q in queries:
             q_vec = list(q)
             scored = []
-            for idx, v in enumerate(self.vectors):
+            for idx, v in enumerate(self._rows):
                 score = sum((qi - vi) ** 2 for qi, vi in zip(q_vec, v))
                 scored.append((score, idx))
             scored.sort(key=lambda x: x[0])
@@ -50,31 +149,131 @@ def _load_documents(corpus_dir: Path) -> List[str]:
             for line in f:
                 if not line.strip():
                     continue
-                data = json.loads(line)
+                data = _json_loads(line)
                 snippet = data.get("text") or json.dumps(data, ensure_ascii=True)
                 docs.append(snippet)
     return docs
 
 
-def build_index(corpus_dir: Path | None = None) -> Tuple[Any, List[str]]:
-    corpus_dir = corpus_dir or Path(__file__).resolve().parent / "corpus"
-    docs = _load_documents(Path(corpus_dir))
-    vectors = embed_texts(docs if docs else ["empty"])
-    dim = len(vectors[0])
+def _embed_corpus(texts: List[str]) -> Any:
+    if np is None:
+        return embed_texts(texts)
+    # Embed in fixed-size batches written straight into one float32 matrix, so peak memory
+    # is the output plus a single batch rather than every intermediate list at once.
+    out = None
+    for start in range(0, len(texts), _EMBED_BATCH_SIZE):
+        batch = np.asarray(embed_texts(texts[start : start + _EMBED_BATCH_SIZE]), dtype=np.float32)
+        if out is None:
+            out = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+        elif batch.shape[1] != out.shape[1]:
+            # The embedder fell back to a different backend mid-corpus; embed everything with one.
+            return np.asarray(embed_texts(texts), dtype=np.float32)
+        out[start : start + batch.shape[0]] = batch
+    return out
+
 
+def _corpus_fingerprint(corpus_dir: Path) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(corpus_dir.glob("*.jsonl")):
+        digest.update(path.name.encode("utf-8") + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _load_persisted_index(index_dir: Path, fingerprint: str, backend: str) -> Tuple[Any, List[str]] | None:
+    try:
+        manifest = _json_loads((index_dir / _MANIFEST_NAME).read_bytes())
+        if not isinstance(manifest, dict):
+            return None
+        if (
+            manifest.get("corpus_sha256") != fingerprint
+            or manifest.get("backend") != backend
+            or manifest.get("embed_backend") != embed_backend()
+        ):
+            return None
+        # Vectors depend on the embedder as well as the text; one probe also catches an embedder
+        # swapped behind the same backend id.
+        dim = manifest.get("dim")
+        if len(embed_texts([_DIM_PROBE])[0]) != dim:
+            return None
+        docs = [_json_loads(line) for line in (index_dir / "docs.jsonl").read_bytes().splitlines() if line.strip()]
+        if backend == "faiss":
+            index = load_faiss(index_dir / "index.faiss")
+            index_dim = index.d
+        else:
+            matrix = load_vectors(index_dir / "index.npy")
+            sq_norms = load_vectors(index_dir / "index_sq.npy")
+            if sq_norms.shape != (matrix.shape[0],):
+                return None
+            index = _InMemoryIndex.from_matrix(matrix, sq_norms)
+            index_dim = index.dim
+    except (OSError, ValueError, ImportError, AttributeError, TypeError):
+        return None
+    if index.ntotal != manifest.get("count") or index_dim != dim:
+        return None
+    return index, docs
+
+
+def _persist_index(index_dir: Path, fingerprint: str, backend: str, index: Any, docs: List[str]) -> None:
+    try:
+        index_dir.mkdir(parents=True, exist_ok=True)
+        # Drop the manifest before touching any artifact, so a save that dies halfway leaves a set
+        # that is rebuilt rather than read as valid.
+        (index_dir / _MANIFEST_NAME).unlink(missing_ok=True)
+        if backend == "faiss":
+            save_faiss(index, index_dir / "index.faiss")
+            dim = index.d
+        else:
+            save_vectors(index.view(), index_dir / "index.npy")
+            # Norms are stored too, so loading never has to read every row to recompute them.
+            save_vectors(index.sq_norms, index_dir / "index_sq.npy")
+            dim = index.dim
+        docs_text = "".join(json.dumps(doc, ensure_ascii=False) + "\n" for doc in docs)
+        write_bytes_atomic(index_dir / "docs.jsonl", docs_text.encode("utf-8"))
+        # The manifest is written last so an interrupted save is never picked up as valid.
+        manifest = {
+            "corpus_sha256": fingerprint,
+            "backend": backend,
+            "embed_backend": embed_backend(),
+            "dim": dim,
+            "count": index.ntotal,
+        }
+        write_bytes_atomic(index_dir / _MANIFEST_NAME, json.dumps(manifest, indent=2).encode("utf-8"))
+    except (OSError, ImportError):
+        pass
+
+
+def build_index(corpus_dir: Path | None = None, index_dir: Path | str | None = None) -> Tuple[Any, List[str]]:
+    corpus_dir = Path(corpus_dir or Path(__file__).resolve().parent / "corpus")
     use_faiss = faiss is not None and np is not None
-    index = faiss.IndexFlatL2(dim) if use_faiss else _InMemoryIndex(dim)
+    index_dir = index_dir or os.getenv("RETRIEVAL_INDEX_DIR")
+    # Persisting needs numpy (or faiss) for the on-disk format; without it, always rebuild.
+    persist_dir = Path(index_dir) if index_dir and np is not None else None
+    backend = "faiss" if use_faiss else "numpy"
+    if persist_dir is not None:
+        fingerprint = _corpus_fingerprint(corpus_dir)
+        loaded = _load_persisted_index(persist_dir, fingerprint, backend)
+        if loaded is not None:
+            return loaded
+
+    docs = _load_documents(corpus_dir)
+    vectors = _embed_corpus(docs if docs else ["empty"])
+    dim = len(vectors[0])
+
+    index = faiss.IndexFlatL2(dim) if use_faiss else _InMemoryIndex(dim, capacity=len(vectors))
 
     if use_faiss:
         index.add(np.asarray(vectors, dtype="float32"))
     else:
-        index.add(vectors.tolist() if hasattr(vectors, "tolist") else vectors)
+        index.add(vectors)
+    if persist_dir is not None:
+        _persist_index(persist_dir, fingerprint, backend, index, docs)
     return index, docs
 
 
 def query_index(index: Any, docs: List[str], text: str, top_k: int = 3) -> List[Tuple[float, str]]:
     queries = embed_texts([text])
-    if faiss is not None and np is not None:
+    if np is not None:
         prepared_queries = np.asarray(queries, dtype="float32")
     else:
         prepared_queries = queries.tolist() if hasattr(queries, "tolist") else queries
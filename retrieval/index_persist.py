@@ -1,7 +1,24 @@
 import json
+import os
+import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Sequence
+from typing import Any, Callable, Dict, List, Sequence
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import faiss  # type: ignore
+except ImportError:  # pragma: no cover
+    faiss = None
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
 
 
 def _extract_embeddings(faiss_index: Any) -> List[List[float]]:
@@ -24,6 +41,68 @@ def _extract_embeddings(faiss_index: Any) -> List[List[float]]:
     return []
 
 
+def _replace_atomically(path: Path, write: Callable[[str], None]) -> Path:
+    # Loaded indexes may still be memory-mapping the current file, so never truncate it in place:
+    # write a sibling temp file and rename it over the old one, which keeps the old inode alive.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def write_bytes_atomic(path: Path | str, data: bytes) -> Path:
+    def write(tmp: str) -> None:
+        with open(tmp, "wb") as f:
+            f.write(data)
+
+    return _replace_atomically(Path(path), write)
+
+
+def save_faiss(index: Any, path: Path | str) -> Path:
+    if faiss is None:
+        raise ImportError("faiss is required to save a FAISS index")
+    return _replace_atomically(Path(path), lambda tmp: faiss.write_index(index, tmp))
+
+
+def load_faiss(path: Path | str) -> Any:
+    if faiss is None:
+        raise ImportError("faiss is required to load a FAISS index")
+    mmap_flag = getattr(faiss, "IO_FLAG_MMAP", None)
+    if mmap_flag is not None:
+        try:
+            return faiss.read_index(str(path), mmap_flag)
+        except Exception:
+            # Not every index type supports mmap loading; fall back to a regular read.
+            pass
+    return faiss.read_index(str(path))
+
+
+def save_vectors(matrix: Any, path: Path | str) -> Path:
+    if np is None:
+        raise ImportError("numpy is required to save index vectors")
+
+    def write(tmp: str) -> None:
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+
+    return _replace_atomically(Path(path), write)
+
+
+def load_vectors(path: Path | str) -> Any:
+    if np is None:
+        raise ImportError("numpy is required to load index vectors")
+    return np.load(str(path), mmap_mode="r")
+
+
 def _connect_pg(pg_conn_str: str):
     try:
         import psycopg  # type: ignore
@@ -38,11 +117,19 @@ def _connect_pg(pg_conn_str: str):
             raise ImportError("psycopg or psycopg2 required for Postgres persistence") from exc
 
 
+def _numpy_default(value: Any) -> Any:
+    # Mirrors orjson's OPT_SERIALIZE_NUMPY for embeddings reconstructed from a faiss index.
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
 def _write_fallback(embeddings: List[List[float]], metadata_list: Sequence[Dict[str, Any]], version: str) -> Path:
     root = Path(__file__).resolve().parents[1]
     fallback_path = root / "replays" / "pgvector_fallback.json"
     fallback_path.parent.mkdir(parents=True, exist_ok=True)
 
+    created_at = datetime.utcnow().isoformat() + "Z"
     records: List[Dict[str, Any]] = []
     for idx, embedding in enumerate(embeddings):
         payload = metadata_list[idx] if idx < len(metadata_list) else {}
@@ -52,13 +139,22 @@ def _write_fallback(embeddings: List[List[float]], metadata_list: Sequence[Dict[
                 "id": record_id,
                 "embedding": list(embedding),
                 "payload": payload,
-                "created_at": datetime.utcnow().isoformat() + "Z",
+                "created_at": created_at,
                 "version": version,
             }
         )
 
-    with open(fallback_path, "w", encoding="utf-8") as f:
-        json.dump({"records": records, "version": version}, f, indent=2)
+    snapshot = {"records": records, "version": version}
+    payload = None
+    if orjson is not None:
+        try:
+            payload = orjson.dumps(snapshot, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # orjson rejects non-str dict keys in payloads; json coerces them.
+            payload = None
+    if payload is None:
+        payload = json.dumps(snapshot, indent=2, default=_numpy_default).encode("utf-8")
+    fallback_path.write_bytes(payload)
     return fallback_path
 
 
@@ -1,6 +1,11 @@
 import json
 from pathlib import Path
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
 
 def read(path: str) -> str:
     p = Path(path)
@@ -132,7 +137,16 @@ def main() -> int:
         "quantize_output": quantize_text,
     }
 
-    Path("reports/model_check.json").write_text(json.dumps(data, indent=2))
+    payload = None
+    if orjson is not None:
+        try:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # orjson rejects non-str dict keys; json coerces them.
+            payload = None
+    if payload is None:
+        payload = json.dumps(data, indent=2).encode("utf-8")
+    Path("reports/model_check.json").write_bytes(payload)
     return 0
 
 
@@ -0,0 +1,54 @@
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SCHEMA_PATH = ROOT / "contracts" / "planner_output.schema.json"
+GENERATED_PATH = ROOT / "planner" / "_runner_validator_generated.py"
+HEADER = "# Generated by scripts/regen_plan_validator.py from contracts/planner_output.schema.json. Do not edit.\n"
+
+try:
+    import fastjsonschema  # type: ignore
+except ImportError:  # pragma: no cover
+    fastjsonschema = None
+
+
+def schema_sha256(schema: dict) -> str:
+    # Hash the canonical form so whitespace or line-ending changes do not mark the module stale.
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def render(schema: dict) -> str:
+    code = fastjsonschema.compile_to_code(schema)
+    return f'{HEADER}SCHEMA_SHA256 = "{schema_sha256(schema)}"\n{code.rstrip()}\n'
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Regenerate the precompiled PlannerOutput validator used by planner/runner.py.")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if the generated module is stale instead of rewriting it")
+    args = parser.parse_args()
+
+    if fastjsonschema is None:
+        print("fastjsonschema is required to regenerate or check the plan validator")
+        return 2
+    schema = json.loads(SCHEMA_PATH.read_text(encoding="utf-8"))
+    expected = render(schema)
+    if args.check:
+        # Compare the whole module, not just the embedded hash, so hand edits to the code are caught too.
+        current = GENERATED_PATH.read_text(encoding="utf-8") if GENERATED_PATH.exists() else None
+        if current != expected:
+            print(f"{GENERATED_PATH.relative_to(ROOT)} is stale or hand-edited; run python scripts/regen_plan_validator.py")
+            return 1
+        print("plan validator up to date")
+        return 0
+
+    GENERATED_PATH.write_text(expected, encoding="utf-8")
+    print(f"wrote {GENERATED_PATH.relative_to(ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,19 @@
 import json
-from datetime import datetime
+import time
 from pathlib import Path
 from typing import Any, Dict
 
 
+def _utc_timestamp() -> str:
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))}.{nanos // 1000:06d}Z"
+
+
 def log_event(event: Dict[str, Any]) -> None:
     base = Path(__file__).resolve().parent
     base.mkdir(parents=True, exist_ok=True)
     path = base / "events.log"
-    payload = {"timestamp": datetime.utcnow().isoformat() + "Z"}
+    payload = {"timestamp": _utc_timestamp()}
     payload.update(event)
     with open(path, "a", encoding="utf-8") as f:
         f.write(json.dumps(payload, ensure_ascii=True, default=str) + "\n")
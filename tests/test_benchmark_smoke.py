@@ -27,3 +27,32 @@ def test_benchmark_script_executes():
         data = json.load(f)
     assert "latencies_ms" in data
     assert data["latencies_ms"]["p95"] >= 0
+
+
+def test_benchmark_restores_planner_cache_setting(monkeypatch):
+    from bench import benchmark_model
+
+    seen = []
+    monkeypatch.delenv("PLANNER_CACHE_DISABLE", raising=False)
+    monkeypatch.setattr(benchmark_model, "_run_benchmark", lambda *args: seen.append(os.environ.get("PLANNER_CACHE_DISABLE")) or {})
+
+    benchmark_model.benchmark(None, 0, 0)
+    assert seen == ["1"]
+    assert "PLANNER_CACHE_DISABLE" not in os.environ
+
+    monkeypatch.setenv("PLANNER_CACHE_DISABLE", "0")
+    benchmark_model.benchmark(None, 0, 0)
+    assert seen[-1] == "0"
+    assert os.environ["PLANNER_CACHE_DISABLE"] == "0"
+
+
+def test_index_cache_key_tracks_embed_backend_and_dim(monkeypatch):
+    from bench import benchmark_model
+
+    base = benchmark_model._index_cache_key()
+    monkeypatch.setattr(benchmark_model, "embed_backend", lambda: "llama:/models/other.gguf")
+    assert benchmark_model._index_cache_key() != base
+
+    monkeypatch.undo()
+    monkeypatch.setattr(benchmark_model, "embed_texts", lambda texts: [[0.0] * 32 for _ in texts])
+    assert benchmark_model._index_cache_key() != base
@@ -23,3 +23,22 @@ def test_full_execution_cycle():
     undo_result = undo()
     assert undo_result["state"] == initial_state
     assert state.snapshot() == initial_state
+
+
+def test_state_clone_is_exact_for_non_json_values():
+    live = {
+        "settings": {"ratio": float("nan"), "pair": (1, 2)},
+        "windows": [{"id": "w", "geometry": (0, 0, 10, 10)}],
+        "logs": ["a"],
+    }
+    copied = state.clone(live)
+    assert copied is not live
+    assert copied["settings"]["pair"] == (1, 2)
+    assert copied["windows"][0]["geometry"] == (0, 0, 10, 10)
+    assert copied["settings"]["ratio"] != copied["settings"]["ratio"]  # still NaN, not None
+    copied["logs"].append("b")
+    assert live["logs"] == ["a"]
+
+    plain = {"logs": ["x"], "settings": {"volume": 50}}
+    plain_copy = state.clone(plain)
+    assert plain_copy == plain and plain_copy["logs"] is not plain["logs"]
@@ -31,3 +31,30 @@ def test_runner_uses_fallback_on_validation_failure(monkeypatch):
     assert plan.intent == "trigger validation fail"
     assert plan.steps[0].step_label == "fb"
     assert plan.confidence == 0.4
+
+
+def test_runner_plan_does_not_alias_caller_inputs(monkeypatch):
+    monkeypatch.setattr(runner, "_call_model", lambda prompt: None)
+    shared_args = {"message": "hi"}
+    monkeypatch.setattr(
+        runner,
+        "fallback_plan",
+        lambda snippets, state_snapshot, user_query: {
+            "intent": user_query,
+            "slots": {},
+            "steps": [{"step_label": "fb", "api_call": "append_log", "args": shared_args, "expected_state": {}}],
+            "sources": snippets,
+            "confidence": 0.4,
+        },
+    )
+
+    snippets = ["snippet"]
+    plan = runner.run_planner(snippets, {"logs": []}, "alias check")
+    assert plan.sources == snippets
+    assert plan.sources is not snippets
+    assert plan.steps[0].args is not shared_args
+
+    plan.sources.append("extra")
+    plan.steps[0].args["message"] = "changed"
+    assert snippets == ["snippet"]
+    assert shared_args == {"message": "hi"}
@@ -28,3 +28,15 @@ def test_persist_index_fallback_creates_file():
         assert isinstance(rec.get("embedding"), list)
         assert rec["embedding"]
         assert "payload" in rec
+
+
+def test_persist_index_fallback_accepts_non_str_payload_keys():
+    index, docs = build_index()
+    metadata = [{"id": 1, "meta": {2: "x", None: "y"}}]
+
+    fallback_path = persist_index_to_pgvector(index, metadata, None, "non-str-keys")
+
+    with open(fallback_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["records"][0]["id"] == "1"
+    assert data["records"][0]["payload"] == {"id": 1, "meta": {"2": "x", "null": "y"}}
@@ -0,0 +1,110 @@
+import pytest
+
+from planner import runner
+
+
+_MODEL_PLAN = {
+    "intent": "cache me",
+    "slots": {},
+    "steps": [{"step_label": "open", "api_call": "open_window", "args": {"window": {"id": "w"}}, "expected_state": {}}],
+    "sources": [],
+    "confidence": 0.9,
+}
+
+
+@pytest.fixture
+def model_calls(monkeypatch):
+    calls = {"count": 0}
+
+    def fake_model(prompt):
+        calls["count"] += 1
+        return {**_MODEL_PLAN, "steps": [dict(step) for step in _MODEL_PLAN["steps"]]}
+
+    events = []
+    monkeypatch.delenv("PLANNER_CACHE_DISABLE", raising=False)
+    monkeypatch.setattr(runner, "_call_model", fake_model)
+    monkeypatch.setattr(runner, "log_event", events.append)
+    runner._PLAN_CACHE.clear()
+    runner._PREVIEW_CACHE.clear()
+    calls["events"] = events
+    yield calls
+    runner._PLAN_CACHE.clear()
+    runner._PREVIEW_CACHE.clear()
+
+
+def test_run_planner_serves_repeated_queries_from_cache(model_calls):
+    first = runner.run_planner(["s"], {"logs": []}, "cache me")
+    second = runner.run_planner(["s"], {"logs": []}, "cache me")
+
+    assert model_calls["count"] == 1
+    assert second.model_dump() == first.model_dump()
+    assert second is not first
+    hashes = [event["planner_output_hash"] for event in model_calls["events"]]
+    assert len(hashes) == 2 and hashes[0] == hashes[1]
+
+    runner.run_planner(["s"], {"logs": ["changed"]}, "cache me")
+    assert model_calls["count"] == 2
+
+
+def test_run_planner_cache_can_be_disabled(model_calls, monkeypatch):
+    monkeypatch.setenv("PLANNER_CACHE_DISABLE", "1")
+    runner.run_planner(["s"], {}, "cache me")
+    runner.run_planner(["s"], {}, "cache me")
+    assert model_calls["count"] == 2
+    assert not runner._PLAN_CACHE
+
+
+def test_run_planner_with_preview_caches_dry_run_per_live_state(model_calls, monkeypatch):
+    from mock_os import executor, state
+
+    dry_runs = {"count": 0}
+    real_dry_run = executor.dry_run
+
+    def counting_dry_run(plan):
+        dry_runs["count"] += 1
+        return real_dry_run(plan)
+
+    monkeypatch.setattr(executor, "dry_run", counting_dry_run)
+    monkeypatch.setattr(state, "STATE", state.clone(state.STATE))
+
+    first = runner.run_planner_with_preview(["s"], {"logs": []}, "cache me")
+    second = runner.run_planner_with_preview(["s"], {"logs": []}, "cache me")
+    assert dry_runs["count"] == 1
+    assert second["dry_run"] == first["dry_run"]
+    assert second["dry_run"] is not first["dry_run"]
+    # The cache hit still emits the dry_run telemetry event that dry_run itself would have.
+    assert [e["event"] for e in model_calls["events"]].count("dry_run") == 1
+
+    state.set_clipboard("live state moved on")
+    third = runner.run_planner_with_preview(["s"], {"logs": []}, "cache me")
+    assert dry_runs["count"] == 2
+    assert third["dry_run"]["original_state"]["clipboard"] == "live state moved on"
+
+
+@pytest.mark.parametrize(
+    "provider, var, value",
+    [
+        ("openai", "REMOTE_OPENAI_MODEL", "gpt-other"),
+        ("openai", "OPENAI_MODEL", "gpt-other"),
+        ("openai", "OPENAI_BASE_URL", "https://proxy.example/v1"),
+        ("google", "REMOTE_GOOGLE_MODEL", "gemini-other"),
+        ("google", "GOOGLE_MODEL", "gemini-other"),
+        ("google", "GOOGLE_API_BASE", "https://proxy.example"),
+    ],
+)
+def test_plan_cache_key_tracks_remote_model_and_endpoint(monkeypatch, provider, var, value):
+    for name in ("REMOTE_OPENAI_MODEL", "OPENAI_MODEL", "OPENAI_BASE_URL", "REMOTE_OPENAI_BASE_URL",
+                 "REMOTE_GOOGLE_MODEL", "GOOGLE_MODEL", "GOOGLE_API_BASE", "PLANNER_CACHE_DISABLE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("USE_REMOTE_MODEL", "1")
+    monkeypatch.setenv("REMOTE_PROVIDER", provider)
+    before = runner._plan_cache_key(["s"], {}, "q")
+
+    monkeypatch.setenv(var, value)
+    assert runner._plan_cache_key(["s"], {}, "q") != before
+
+    # Without the remote toggle the local model answers, so remote settings do not split the cache.
+    monkeypatch.setenv("USE_REMOTE_MODEL", "0")
+    local = runner._plan_cache_key(["s"], {}, "q")
+    monkeypatch.delenv(var)
+    assert runner._plan_cache_key(["s"], {}, "q") == local
@@ -1,3 +1,4 @@
+import importlib.util
 import json
 from pathlib import Path
 
@@ -46,3 +47,20 @@ def test_planner_matches_schema():
     jsonschema.validate(instance=payload, schema=schema)
     assert payload.get("intent") == prompt
     assert payload.get("steps"), "planner returned no steps"
+
+
+def test_generated_validator_matches_regenerated_code():
+    fastjsonschema = pytest.importorskip("fastjsonschema")
+    from planner import _runner_validator_generated as generated
+
+    if generated.VERSION != fastjsonschema.VERSION:
+        pytest.skip("installed fastjsonschema differs from the version the validator was generated with")
+
+    script = Path(__file__).resolve().parents[1] / "scripts" / "regen_plan_validator.py"
+    spec = importlib.util.spec_from_file_location("regen_plan_validator", script)
+    regen = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(regen)
+
+    checked_in = regen.GENERATED_PATH.read_text(encoding="utf-8")
+    assert checked_in.endswith("\n")
+    assert checked_in == regen.render(_load_schema())
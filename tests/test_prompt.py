@@ -0,0 +1,51 @@
+import json
+
+from planner.prompt import build_prompt
+
+
+def test_build_prompt_accepts_non_str_setting_keys():
+    # update_setting with a non-str key leaves settings[5] / settings[None] in live state.
+    prompt = build_prompt(["s"], {"settings": {5: "x", None: "y"}}, "q")
+    assert json.loads(prompt)["context"]["state"]["settings"] == {"5": "x", "null": "y"}
+
+
+def _baseline_prompt(retrieval_snippets, state_snapshot, user_query):
+    # The pre-scaffold implementation: one json.dumps over the whole prompt dict.
+    from planner.prompt import SYSTEM_PROMPT
+
+    prompt = {
+        "system": SYSTEM_PROMPT,
+        "schema": "intent:string, slots:object, steps:[{step_label, api_call, args, expected_state}], sources:list, confidence:number",
+        "context": {
+            "retrieval_snippets": retrieval_snippets,
+            "state": state_snapshot,
+            "user_query": user_query,
+        },
+        "instructions": [
+            "Use only available mock_os APIs: open_window, write_clipboard, update_setting, append_log.",
+            "Keep steps minimal and ordered.",
+            "All fields required.",
+        ],
+    }
+    return json.dumps(prompt, ensure_ascii=True)
+
+
+def _ordered(value):
+    # Dict equality ignores order; compare key sequences too.
+    if isinstance(value, dict):
+        return [(key, _ordered(item)) for key, item in value.items()]
+    if isinstance(value, list):
+        return [_ordered(item) for item in value]
+    return value
+
+
+def test_build_prompt_matches_baseline_payload():
+    cases = [
+        (["snippet one", "snippet é two"], {"windows": [{"id": "w1", "title": "T"}], "clipboard": "", "settings": {"z": 1, "a": True}}, "open notes"),
+        ([], {}, ""),
+        (["s"], {"settings": {5: "x", None: "y", "k": [1.5, None]}}, "q \"quoted\""),
+    ]
+    for snippets, state_snapshot, query in cases:
+        got = json.loads(build_prompt(snippets, state_snapshot, query))
+        expected = json.loads(_baseline_prompt(snippets, state_snapshot, query))
+        assert _ordered(got) == _ordered(expected)
@@ -0,0 +1,400 @@
+import ast
+import asyncio
+import gc
+import json
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+import requests
+
+from planner import remote_adapter
+
+
+class _FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeSession:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def post(self, url, timeout=None, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _install(monkeypatch, outcomes):
+    session = _FakeSession(outcomes)
+    sleeps = []
+    monkeypatch.setattr(remote_adapter, "_http_session", lambda: session)
+    monkeypatch.setattr(remote_adapter.time, "sleep", sleeps.append)
+    return session, sleeps
+
+
+def test_post_with_retry_recovers_from_transient_errors(monkeypatch):
+    busy = _FakeResponse(503, {"Retry-After": "2"})
+    ok = _FakeResponse(200)
+    session, sleeps = _install(monkeypatch, [requests.ConnectionError("reset"), busy, ok])
+
+    response = remote_adapter._post_with_retry("https://example.invalid", 5, json={})
+
+    assert response is ok
+    assert session.calls == 3
+    assert busy.closed
+    assert len(sleeps) == 2
+    assert sleeps[1] == 2.0
+
+
+def test_post_with_retry_gives_up_after_configured_attempts(monkeypatch):
+    monkeypatch.setenv("REMOTE_RETRY_ATTEMPTS", "2")
+    last = _FakeResponse(429)
+    session, sleeps = _install(monkeypatch, [_FakeResponse(429), last])
+
+    response = remote_adapter._post_with_retry("https://example.invalid", 5, json={})
+
+    assert response is last
+    assert session.calls == 2
+    assert len(sleeps) == 1
+
+
+def test_post_with_retry_does_not_retry_client_errors(monkeypatch):
+    bad_request = _FakeResponse(400)
+    session, sleeps = _install(monkeypatch, [bad_request])
+
+    assert remote_adapter._post_with_retry("https://example.invalid", 5, json={}) is bad_request
+    assert session.calls == 1
+    assert not sleeps
+
+
+def test_post_with_retry_raises_when_timeouts_persist(monkeypatch):
+    monkeypatch.setenv("REMOTE_RETRY_ATTEMPTS", "2")
+    _install(monkeypatch, [requests.Timeout("slow"), requests.Timeout("slow")])
+
+    with pytest.raises(requests.Timeout):
+        remote_adapter._post_with_retry("https://example.invalid", 5, json={})
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_post_with_retry_stays_within_timeout_budget(monkeypatch):
+    monkeypatch.setenv("REMOTE_RETRY_ATTEMPTS", "10")
+    clock = _Clock()
+    timeouts = []
+
+    class _SlowSession:
+        def post(self, url, timeout=None, **kwargs):
+            timeouts.append(timeout)
+            clock.sleep(min(timeout, 2.0))
+            return _FakeResponse(503, {"Retry-After": "3"})
+
+    monkeypatch.setattr(remote_adapter, "_http_session", lambda: _SlowSession())
+    monkeypatch.setattr(remote_adapter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(remote_adapter.time, "sleep", clock.sleep)
+    start = clock.now
+
+    response = remote_adapter._post_with_retry("https://example.invalid", 10, json={})
+
+    assert response.status_code == 503
+    assert clock.now - start <= 10
+    assert len(timeouts) == 2
+    assert timeouts[0] == 10
+    assert timeouts[1] == pytest.approx(5.0)
+
+
+def test_apost_with_retry_stays_within_timeout_budget(monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    monkeypatch.setenv("REMOTE_RETRY_ATTEMPTS", "10")
+    clock = _Clock()
+    timeouts = []
+
+    class _SlowClient:
+        async def post(self, url, timeout=None, **kwargs):
+            timeouts.append(timeout)
+            clock.sleep(min(timeout, 2.0))
+            raise httpx.ConnectTimeout("slow")
+
+    async def _sleep(seconds):
+        clock.sleep(seconds)
+
+    monkeypatch.setattr(remote_adapter, "_async_http", lambda: _SlowClient())
+    monkeypatch.setattr(remote_adapter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(remote_adapter.asyncio, "sleep", _sleep)
+    monkeypatch.setattr(remote_adapter, "_retry_delay", lambda attempt, response: 1.5)
+    start = clock.now
+
+    with pytest.raises(httpx.ConnectTimeout):
+        asyncio.run(remote_adapter._apost_with_retry("https://example.invalid", 6, json={}))
+
+    assert clock.now - start <= 6
+    assert len(timeouts) == 2
+
+
+_PLAN = {
+    "intent": "open_notes",
+    "slots": {},
+    "steps": [{"step_label": "open", "api_call": "window.open", "args": {}, "expected_state": {}}],
+    "sources": [],
+    "confidence": 0.9,
+}
+
+
+def test_acall_remote_planner_returns_first_provider_to_finish(monkeypatch):
+    cancelled = []
+
+    async def slow(*args):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append("openai")
+            raise
+        return dict(_PLAN, intent="slow")
+
+    async def fast(*args):
+        return dict(_PLAN, intent="fast")
+
+    monkeypatch.setattr(remote_adapter, "_acall_openai", slow)
+    monkeypatch.setattr(remote_adapter, "_acall_google", fast)
+
+    async def run():
+        plan = await remote_adapter.acall_remote_planner([], {}, "q", providers=["openai", "google"])
+        await asyncio.sleep(0)
+        return plan
+
+    assert asyncio.run(run())["intent"] == "fast"
+    assert cancelled == ["openai"]
+
+
+def test_acall_remote_planner_falls_back_when_a_provider_fails(monkeypatch):
+    async def broken(*args):
+        raise RuntimeError("boom")
+
+    async def ok(*args):
+        await asyncio.sleep(0.01)
+        return dict(_PLAN)
+
+    monkeypatch.setattr(remote_adapter, "_acall_openai", broken)
+    monkeypatch.setattr(remote_adapter, "_acall_google", ok)
+    plan = asyncio.run(remote_adapter.acall_remote_planner([], {}, "q", providers=["openai", "google"]))
+    assert plan["intent"] == "open_notes"
+
+    monkeypatch.setattr(remote_adapter, "_acall_google", broken)
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(remote_adapter.acall_remote_planner([], {}, "q", providers=["openai", "google"]))
+
+
+def test_remote_adapter_defines_each_function_once():
+    tree = ast.parse(Path(remote_adapter.__file__).read_text(encoding="utf-8"))
+    counts = Counter(
+        node.name for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    )
+    assert counts["call_remote_planner"] == 1
+    assert [name for name, count in counts.items() if count > 1] == []
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda plan: None,
+        lambda plan: plan.pop("slots"),
+        lambda plan: plan.update(extra=1),
+        lambda plan: plan.update(intent=3),
+        lambda plan: plan.update(confidence=1.5),
+        lambda plan: plan.update(confidence=True),
+        lambda plan: plan.update(sources=["a", 1]),
+        lambda plan: plan.update(steps=[]),
+        lambda plan: plan["steps"][0].pop("args"),
+        lambda plan: plan["steps"][0].update(note="x"),
+        lambda plan: plan["steps"][0].update(expected_state=[]),
+    ],
+)
+def test_fast_check_agrees_with_full_validator(mutate):
+    plan = {**_PLAN, "steps": [dict(_PLAN["steps"][0])]}
+    mutate(plan)
+    try:
+        remote_adapter._planner_validator()(plan)
+        full_ok = True
+    except Exception:
+        full_ok = False
+    assert (remote_adapter._fast_check(plan) is None) == full_ok
+    assert remote_adapter.minimal_sanity_check(plan) == full_ok
+
+
+class _StreamResponse:
+    status_code = 200
+    ok = True
+
+    def __init__(self, lines):
+        self._lines = lines
+
+    def iter_lines(self):
+        return iter(self._lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _sse(delta):
+    return "data: " + json.dumps({"choices": [{"index": 0, "delta": delta}]})
+
+
+def test_openai_stream_message_joins_content_deltas():
+    lines = [
+        b": keep-alive",
+        _sse({"role": "assistant"}).encode("utf-8"),
+        _sse({"content": '{"intent": '}),
+        "",
+        _sse({"content": '"open_notes"}'}),
+        "data: [DONE]",
+        _sse({"content": "ignored after DONE"}),
+    ]
+    message = remote_adapter._openai_stream_message(lines)
+    assert message == {"content": '{"intent": "open_notes"}'}
+
+
+def test_openai_stream_message_joins_tool_call_argument_fragments():
+    lines = [
+        _sse({"tool_calls": [{"index": 0, "function": {"name": "emit_plan", "arguments": ""}}]}),
+        _sse({"tool_calls": [{"index": 0, "function": {"arguments": '{"intent": "o'}}]}),
+        _sse({"tool_calls": [{"index": 1, "function": {"arguments": "other call"}}]}),
+        _sse({"tool_calls": [{"index": 0, "function": {"arguments": 'pen"}'}}]}),
+        "data: [DONE]",
+    ]
+    message = remote_adapter._openai_stream_message(lines)
+    assert message["content"] == ""
+    assert message["tool_calls"] == [{"function": {"arguments": '{"intent": "open"}'}}]
+
+
+def test_openai_stream_message_skips_malformed_events():
+    lines = [_sse({"content": '{"a": '}), 'data: {"choices": [', _sse({"content": "1}"}), "data: [DONE]"]
+    assert remote_adapter._openai_stream_message(lines) == {"content": '{"a": 1}'}
+
+
+def test_call_openai_assembles_streamed_plan(monkeypatch):
+    monkeypatch.delenv("REMOTE_OPENAI_STREAM", raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    body = json.dumps(_PLAN)
+    lines = [_sse({"content": body[:20]}).encode("utf-8"), _sse({"content": body[20:]}).encode("utf-8"), b"data: [DONE]"]
+    seen = {}
+
+    def fake_post(url, timeout, **kwargs):
+        seen.update(kwargs)
+        return _StreamResponse(lines)
+
+    monkeypatch.setattr(remote_adapter, "_post_with_retry", fake_post)
+    plan = remote_adapter._call_openai([], {}, "q", 5)
+    assert plan == _PLAN
+    assert seen["stream"] is True
+    assert seen["json"]["stream"] is True
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"intent": "a"}', {"intent": "a"}),
+        ('  \n{"intent": "a"}\n ', {"intent": "a"}),
+        ('Here is the plan: {"intent": "a"} Let me know!', {"intent": "a"}),
+        ('```json\n{"intent": "a"}\n```', {"intent": "a"}),
+        ('{"slots": {"inner": {"deep": [1, {"x": 2}]}}}', {"slots": {"inner": {"deep": [1, {"x": 2}]}}}),
+        ('Plan: {"slots": {"a": {}}, "steps": []} done', {"slots": {"a": {}}, "steps": []}),
+        ('{"note": "use } and { freely", "x": "}"}', {"note": "use } and { freely", "x": "}"}),
+        ('prefix {"note": "a { brace"} suffix', {"note": "a { brace"}),
+        ("no json here at all", None),
+        ("", None),
+        (None, None),
+        ("} backwards {", None),
+        ('{"intent": "a"} and also {"intent": "b"}', None),
+        ('{"intent": ', None),
+    ],
+)
+def test_parse_json_fragment(text, expected):
+    assert remote_adapter._parse_json_fragment(text) == expected
+
+
+def test_acall_remote_planner_reaps_losing_tasks(monkeypatch):
+    reaped = []
+
+    async def slow(*args):
+        try:
+            await asyncio.sleep(5)
+        finally:
+            reaped.append("openai")
+
+    async def fast(*args):
+        return dict(_PLAN)
+
+    monkeypatch.setattr(remote_adapter, "_acall_openai", slow)
+    monkeypatch.setattr(remote_adapter, "_acall_google", fast)
+
+    async def run():
+        plan = await remote_adapter.acall_remote_planner([], {}, "q", providers=["openai", "google"])
+        # No extra yield: the loser has already finished by the time the winner is returned.
+        return plan, reaped[:], asyncio.all_tasks() - {asyncio.current_task()}
+
+    plan, seen, leftover = asyncio.run(run())
+    assert plan["intent"] == "open_notes"
+    assert seen == ["openai"]
+    assert not leftover
+
+
+def test_async_http_client_is_released_with_its_loop():
+    pytest.importorskip("httpx")
+
+    async def grab():
+        return id(remote_adapter._async_http()), id(remote_adapter._async_http())
+
+    first, again = asyncio.run(grab())
+    assert first == again
+    gc.collect()
+    assert len(remote_adapter._ASYNC_HTTP) == 0
+
+
+def test_importing_runner_does_not_start_log_listener():
+    code = (
+        "import logging, threading\n"
+        "import planner.runner\n"
+        "assert planner.runner.remote_adapter is not None\n"
+        "assert not logging.getLogger('planner.remote_adapter').handlers\n"
+        "print(sorted(t.name for t in threading.enumerate()))\n"
+    )
+    repo_root = Path(__file__).resolve().parents[1]
+    result = subprocess.run([sys.executable, "-c", code], cwd=repo_root, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "['MainThread']"
+
+
+def test_ensure_logger_tolerates_unwritable_log_dir(tmp_path, monkeypatch):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("", encoding="utf-8")
+    monkeypatch.setattr(remote_adapter, "_LOG_PATH", blocker / "reports" / "remote_adapter.log")
+    monkeypatch.setattr(remote_adapter, "_LOGGER_READY", False)
+    monkeypatch.setattr(remote_adapter.logger, "handlers", [])
+
+    remote_adapter._ensure_logger()
+
+    assert remote_adapter._LOGGER_READY
+    assert not remote_adapter.logger.handlers
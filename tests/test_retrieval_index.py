@@ -0,0 +1,156 @@
+import random
+
+import pytest
+
+from retrieval import index as retrieval_index
+
+np = pytest.importorskip("numpy")
+
+
+def _python_index(vectors):
+    idx = retrieval_index._InMemoryIndex(len(vectors[0]))
+    idx._buf = None
+    idx._rows = []
+    idx.add(vectors)
+    return idx
+
+
+def test_in_memory_search_matches_pure_python_ranking():
+    rng = random.Random(7)
+    vectors = [[rng.random() for _ in range(16)] for _ in range(64)]
+    queries = [[rng.random() for _ in range(16)] for _ in range(4)]
+
+    fast = retrieval_index._InMemoryIndex(16)
+    fast.add(np.asarray(vectors, dtype=np.float32))
+    slow = _python_index(vectors)
+
+    fast_scores, fast_ids = fast.search(queries, 5)
+    slow_scores, slow_ids = slow.search(queries, 5)
+
+    assert fast_ids.tolist() == slow_ids
+    assert np.allclose(fast_scores, slow_scores, atol=1e-5)
+    assert len(fast.vectors) == 64
+
+
+def test_in_memory_search_clamps_k_to_index_size():
+    idx = retrieval_index._InMemoryIndex(2)
+    idx.add([[0.0, 0.0], [1.0, 1.0]])
+    scores, ids = idx.search([[0.9, 0.9]], 5)
+    assert ids.tolist() == [[1, 0]]
+    assert scores.shape == (1, 2)
+
+
+def test_in_memory_add_grows_buffer_without_losing_rows():
+    idx = retrieval_index._InMemoryIndex(3, capacity=2)
+    for i in range(5):
+        idx.add([[float(i)] * 3])
+    assert idx.ntotal == 5
+    assert idx.view().tolist() == [[float(i)] * 3 for i in range(5)]
+    assert idx.search([[4.0, 4.0, 4.0]], 1)[1].tolist() == [[4]]
+
+
+def test_in_memory_add_after_empty_matrix():
+    idx = retrieval_index._InMemoryIndex.from_matrix(np.empty((0, 2), dtype=np.float32))
+    assert idx.ntotal == 0
+    idx.add([[1.0, 2.0], [3.0, 4.0]])
+    assert idx.view().tolist() == [[1.0, 2.0], [3.0, 4.0]]
+    assert idx.search([[3.0, 4.0]], 1)[1].tolist() == [[1]]
+
+
+def test_build_index_reuses_persisted_index(tmp_path, monkeypatch):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "docs.jsonl").write_text('{"text": "open the notes app"}\n{"text": "copy to clipboard"}\n', encoding="utf-8")
+    index_dir = tmp_path / "index"
+
+    calls = {"count": 0}
+    real_embed = retrieval_index.embed_texts
+
+    def counting_embed(texts):
+        calls["count"] += 1
+        return real_embed(texts)
+
+    monkeypatch.setattr(retrieval_index, "embed_texts", counting_embed)
+
+    built, docs = retrieval_index.build_index(corpus, index_dir=index_dir)
+    assert (index_dir / "manifest.json").exists()
+    embeds_after_build = calls["count"]
+
+    loaded, loaded_docs = retrieval_index.build_index(corpus, index_dir=index_dir)
+    # Only the single dim probe runs; the corpus is not re-embedded.
+    assert calls["count"] == embeds_after_build + 1
+    assert isinstance(loaded.sq_norms, np.memmap)
+    assert np.allclose(loaded.sq_norms, built.sq_norms)
+    assert loaded_docs == docs
+    query = [real_embed(["clipboard"])[0].tolist()]
+    assert loaded.search(query, 2)[1].tolist() == built.search(query, 2)[1].tolist()
+
+    (corpus / "docs.jsonl").write_text('{"text": "changed corpus"}\n', encoding="utf-8")
+    _, rebuilt_docs = retrieval_index.build_index(corpus, index_dir=index_dir)
+    assert rebuilt_docs == ["changed corpus"]
+    assert calls["count"] > embeds_after_build
+
+
+def test_build_index_rejects_persisted_index_from_another_embedder(tmp_path, monkeypatch):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "docs.jsonl").write_text('{"text": "open the notes app"}\n', encoding="utf-8")
+    index_dir = tmp_path / "index"
+
+    built, _ = retrieval_index.build_index(corpus, index_dir=index_dir)
+    assert built.dim == 16
+
+    def wide_embed(texts):
+        return np.ones((len(texts), 32), dtype=np.float32)
+
+    monkeypatch.setattr(retrieval_index, "embed_texts", wide_embed)
+    rebuilt, _ = retrieval_index.build_index(corpus, index_dir=index_dir)
+    assert rebuilt.dim == 32
+
+    monkeypatch.setattr(retrieval_index, "embed_backend", lambda: "llama:/elsewhere.gguf")
+    calls = {"count": 0}
+
+    def counting_embed(texts):
+        calls["count"] += 1
+        return wide_embed(texts)
+
+    monkeypatch.setattr(retrieval_index, "embed_texts", counting_embed)
+    retrieval_index.build_index(corpus, index_dir=index_dir)
+    # A backend-id mismatch rebuilds without probing.
+    assert calls["count"] == 1
+
+
+def test_rebuild_does_not_truncate_files_under_a_live_memmap(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    lines = "".join(f'{{"text": "document number {i}"}}\n' for i in range(2000))
+    (corpus / "docs.jsonl").write_text(lines, encoding="utf-8")
+    index_dir = tmp_path / "index"
+
+    retrieval_index.build_index(corpus, index_dir=index_dir)
+    loaded, _ = retrieval_index.build_index(corpus, index_dir=index_dir)
+    assert isinstance(loaded.view(), np.memmap)
+    expected_row = np.array(loaded.view()[1500])
+
+    (corpus / "docs.jsonl").write_text('{"text": "only one document"}\n', encoding="utf-8")
+    rebuilt, rebuilt_docs = retrieval_index.build_index(corpus, index_dir=index_dir)
+    assert rebuilt_docs == ["only one document"]
+    assert rebuilt.ntotal == 1
+
+    # The old mapping still reads its original rows instead of faulting on a truncated file.
+    assert np.array_equal(loaded.view()[1500], expected_row)
+    assert float(loaded.sq_norms[1999]) >= 0.0
+    assert not list(index_dir.glob("*.tmp"))
+
+
+@pytest.mark.parametrize("manifest", ["[]", '"text"', "3", "null"])
+def test_build_index_rebuilds_on_non_dict_manifest(tmp_path, manifest):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "docs.jsonl").write_text('{"text": "open the notes app"}\n', encoding="utf-8")
+    index_dir = tmp_path / "index"
+    retrieval_index.build_index(corpus, index_dir=index_dir)
+    (index_dir / "manifest.json").write_text(manifest, encoding="utf-8")
+
+    _, docs = retrieval_index.build_index(corpus, index_dir=index_dir)
+    assert docs == ["open the notes app"]